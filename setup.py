@@ -1,11 +1,16 @@
-from setuptools import setup, find_packages
+from setuptools import setup
 
 setup(
     name="staffer",
     version="0.2.0",
     description="AI coding agent that works in any directory",
     author="Staffer Team",
-    packages=find_packages(),
+    packages=[
+        "staffer",
+        "staffer.cli",
+        "staffer.functions",
+        "staffer.ui",
+    ],
     install_requires=[
         "google-genai==1.12.1",
         "python-dotenv==1.1.0",
@@ -0,0 +1,31 @@
+"""Per-object memoization for values derived from unhashable objects."""
+
+import weakref
+
+
+def get_or_compute(cache, obj, compute, key=None):
+    """Return compute(obj), computed once for as long as obj is alive.
+
+    cache is a plain dict owned by the caller, mapping key (id(obj) unless
+    given) to (weakref to obj, value). Content objects aren't hashable, so
+    id() stands in for them; the weakref callback removes the entry as soon
+    as obj is collected, before its id can be reused. Objects that can't be
+    weakly referenced are computed every time.
+
+    The value is never recomputed, so only cache what can't change: staffer
+    treats messages as immutable once they are in the history and builds new
+    Content objects instead of editing old ones.
+    """
+    if key is None:
+        key = id(obj)
+    cached = cache.get(key)
+    if cached is not None and cached[0]() is obj:
+        return cached[1]
+
+    value = compute(obj)
+    try:
+        ref = weakref.ref(obj, lambda _ref, key=key: cache.pop(key, None))
+    except TypeError:
+        return value
+    cache[key] = (ref, value)
+    return value
@@ -5,6 +5,7 @@ from .functions.get_file_content import schema_get_file_content, get_file_conten
 from .functions.write_file import schema_write_file, write_file
 from .functions.run_python_file import schema_run_python_file, run_python_file
 from .functions.get_working_directory import schema_get_working_directory, get_working_directory
+from .types_helpers import tool_response
 
 
 available_functions = types.Tool(
@@ -17,6 +18,20 @@ available_functions = types.Tool(
     ]
 )
 
+# Functions that only read state, so several of them can run at once
+READ_ONLY_FUNCTIONS = frozenset({"get_files_info", "get_file_content", "get_working_directory"})
+
+# Tool results above this size are cut before being wrapped in a proto
+MAX_RESULT_CHARS = 512 * 1024
+
+_BUILTIN_FUNCTIONS = {
+    "get_files_info": get_files_info,
+    "get_file_content": get_file_content,
+    "write_file": write_file,
+    "run_python_file": run_python_file,
+    "get_working_directory": get_working_directory,
+}
+
 def get_available_functions(working_dir):
     return available_functions
 
@@ -29,33 +44,13 @@ def call_function(function_call_part, working_directory, verbose=False):
     args = function_call_part.args or {}
     function_name = function_call_part.name.lower()
 
-    function_dict = {
-        "get_files_info": get_files_info,
-        "get_file_content": get_file_content,
-        "write_file": write_file,
-        "run_python_file": run_python_file,
-        "get_working_directory": get_working_directory
-    }
-
-    if function_name not in function_dict:
-        return types.Content(
-            role="tool",
-            parts=[
-                types.Part.from_function_response(
-                    name=function_name,
-                    response={"error": f"Unknown function: {function_name}"},
-                )
-            ],
-        )
+    function = _BUILTIN_FUNCTIONS.get(function_name)
+
+    if function is None:
+        return tool_response(function_name, {"error": f"Unknown function: {function_name}"})
     
-    function_result = function_dict[function_name](working_directory, **args)
-
-    return types.Content(
-    role="tool",
-    parts=[
-        types.Part.from_function_response(
-            name=function_name,
-            response={"result": function_result},
-        )
-    ],
-)
\ No newline at end of file
+    function_result = function(working_directory, **args)
+    if isinstance(function_result, str) and len(function_result) > MAX_RESULT_CHARS:
+        function_result = f'{function_result[:MAX_RESULT_CHARS]}...Result of "{function_name}" truncated at {MAX_RESULT_CHARS} characters'
+
+    return tool_response(function_name, {"result": function_result})
@@ -1,5 +1,17 @@
 """CLI module for Staffer."""
 
-from ..main import main
+from .parser import build_parser
 
-__all__ = ['main', 'interactive']
\ No newline at end of file
+
+def main():
+    """Console entry point.
+
+    Arguments are parsed before staffer.main (and with it google.genai) is
+    imported, so --help and --version don't pay for the SDK import.
+    """
+    args = build_parser().parse_args()
+    from ..main import run
+    run(args)
+
+
+__all__ = ['main', 'interactive']
@@ -4,12 +4,18 @@ import os
 from pathlib import Path
 from google.genai import types
 from ..main import process_prompt
-from ..session import load_session, save_session, create_working_directory_message, load_session_with_metadata, save_session_with_metadata
-from ..available_functions import get_available_functions, call_function
-from ..llm import get_client
+from ..session import load_session, save_session, load_session_with_metadata, message_char_count, SessionWriter
+from ..available_functions import call_function
+from ..llm_cache import clear_cache
+from ..types_helpers import model_text
 from ..ui.terminal import get_terminal_ui
 
 
+EXIT_COMMANDS = frozenset({'exit', 'quit'})
+
+CONFIRMED_WORKING_DIRECTORY = "🛠️ **Confirmed working directory**:"
+
+
 def check_directory_change(metadata):
     """Check if cwd has changed since session creation."""
     current_cwd = os.getcwd()
@@ -31,95 +37,46 @@ def prompt_directory_change(old_dir, new_dir):
 
 def should_reinitialize_working_directory(messages, current_dir):
     """Check if we need to reinitialize working directory based on message history."""
-    # For now, always reinitialize to ensure fresh context
-    # TODO: Could add smarter detection based on last working directory call
+    # The most recent confirmation decides; older ones may be from another directory
+    for message in reversed(messages):
+        text = getattr(message.parts[0], 'text', None) if getattr(message, 'parts', None) else None
+        if text and text.startswith(CONFIRMED_WORKING_DIRECTORY):
+            confirmed_dir = text[len(CONFIRMED_WORKING_DIRECTORY):].strip()
+            return confirmed_dir != str(current_dir)
     return True
 
 
 def initialize_session_with_working_directory(messages):
-    """Force AI to call get_working_directory to establish current location."""
+    """Record a get_working_directory call so the AI knows its current location.
+    
+    The working directory is known locally, so the call and its result are
+    added to the history directly instead of asking the model to make the call.
+    """
     working_directory = Path(os.getcwd())
-    available_functions = get_available_functions(str(working_directory))
     
-    # Add explicit directive to get working directory
-    init_prompt = "You MUST call get_working_directory() to confirm your current working directory before proceeding."
-    current_message = types.Content(
-        role="user",
-        parts=[types.Part(text=init_prompt)]
+    function_call = types.FunctionCall(name="get_working_directory", args={})
+    call_message = types.Content(
+        role="model",
+        parts=[types.Part(function_call=function_call)]
     )
+    function_result = call_function(function_call, str(working_directory))
     
-    conversation = messages + [current_message]
-    
-    # Enhanced system instruction to force function call
-    system_prompt = """On every new interactive session initialization, your FIRST ACTION must be calling get_working_directory(). 
-Do not proceed with any other requests until you've explicitly called and confirmed the working directory.
-
-You MUST call get_working_directory() immediately when asked to confirm your working directory."""
-    
-    client = get_client()
+    confirmation = model_text(f"{CONFIRMED_WORKING_DIRECTORY} {working_directory}")
     
-    # Force the function call
-    for i in range(3):  # Try up to 3 times
-        res = client.models.generate_content(
-            model="gemini-2.0-flash-001",
-            contents=conversation,
-            config=types.GenerateContentConfig(
-                tools=[available_functions],
-                system_instruction=system_prompt
-            )
-        )
-        
-        if res.candidates:
-            for candidate in res.candidates:
-                conversation.append(candidate.content)
-                for part in candidate.content.parts:
-                    if part.function_call and part.function_call.name == "get_working_directory":
-                        # Function called! Execute it and add result
-                        function_result = call_function(part.function_call, str(working_directory))
-                        conversation.append(function_result)
-                        
-                        # Add confirmation message
-                        confirmation = types.Content(
-                            role="model",
-                            parts=[types.Part(text=f"🛠️ **Confirmed working directory**: {working_directory}")]
-                        )
-                        conversation.append(confirmation)
-                        
-                        # Return only the original messages + new working directory context (skip init prompt)
-                        return messages + conversation[len(messages) + 1:]
-        
-        # If no function call, break
-        if not any(part.function_call for candidate in res.candidates for part in candidate.content.parts if part.function_call):
-            break
-    
-    # If function wasn't called, return original messages
-    return messages
+    return messages + [call_message, function_result, confirmation]
 
 
-def process_command(user_input, messages):
+def process_command(user_input, messages, session_writer):
     """Process special commands. Returns (handled, updated_messages)."""
     if not user_input.startswith('/'):
         return False, messages
     
-    command = user_input.lower()
-    
-    if command == '/reset':
-        print("Session cleared. Starting fresh in", os.getcwd())
-        save_session_with_metadata([])  # Save empty session
-        return True, []  # Clear all messages
-    
-    elif command == '/session':
-        show_session_info(messages)
-        return True, messages  # Don't modify messages
-    
-    elif command == '/help':
-        show_help()
-        return True, messages  # Don't modify messages
-    
-    else:
+    handler = _COMMANDS.get(user_input.lower())
+    if handler is None:
         print(f"Unknown command: {user_input}")
         print("Type /help for available commands")
         return True, messages  # Don't modify messages
+    return handler(messages, session_writer)
 
 
 def show_session_info(messages):
@@ -131,7 +88,7 @@ def show_session_info(messages):
     print(f"Messages: {message_count}")
     
     # Basic token estimation (rough approximation)
-    total_chars = sum(len(str(msg)) for msg in messages if hasattr(msg, 'parts'))
+    total_chars = sum(message_char_count(msg) for msg in messages if hasattr(msg, 'parts'))
     estimated_tokens = total_chars // 4
     print(f"Estimated tokens: {estimated_tokens}")
 
@@ -145,6 +102,31 @@ def show_help():
     print("  exit      - Save session and quit")
 
 
+def _cmd_reset(messages, session_writer):
+    print("Session cleared. Starting fresh in", os.getcwd())
+    session_writer.flush_now([])  # Save empty session, dropping any pending save
+    clear_cache()  # Fresh start means fresh model responses too
+    return True, []  # Clear all messages
+
+
+def _cmd_session(messages, session_writer):
+    show_session_info(messages)
+    return True, messages  # Don't modify messages
+
+
+def _cmd_help(messages, session_writer):
+    show_help()
+    return True, messages  # Don't modify messages
+
+
+# Slash command -> handler returning (handled, messages)
+_COMMANDS = {
+    '/reset': _cmd_reset,
+    '/session': _cmd_session,
+    '/help': _cmd_help,
+}
+
+
 def main():
     """Main interactive mode entry point."""
     # Get terminal UI (enhanced or basic)
@@ -152,6 +134,9 @@ def main():
     terminal.display_welcome()
     terminal.display_success("Type 'exit' or 'quit' to end the session")
     
+    # Debounces history saves for this run; flushed explicitly on exit and /reset
+    session_writer = SessionWriter()
+    
     # Load previous session with metadata 
     messages, metadata = load_session_with_metadata()
     
@@ -176,15 +161,18 @@ def main():
     if should_reinitialize_working_directory(messages, current_dir):
         with terminal.show_spinner("Initializing working directory context..."):
             messages = initialize_session_with_working_directory(messages)
-            save_session_with_metadata(messages)
+            session_writer.mark_dirty(messages)
     
     print()  # Spacing
     
+    # Working directory is fixed for the lifetime of the loop
+    cwd_str = str(current_dir)
+    
     while True:
         try:
             # Build session info for rich prompt
             session_info = {
-                'cwd': str(current_dir),
+                'cwd': cwd_str,
                 'message_count': len(messages)
             }
             user_input = terminal.get_input(session_info).strip()
@@ -192,26 +180,27 @@ def main():
             if not user_input:
                 continue
                 
-            if user_input.lower() in ['exit', 'quit']:
+            if user_input.lower() in EXIT_COMMANDS:
                 # Save session with metadata before exiting - Slice 4 feature
-                save_session_with_metadata(messages)
+                session_writer.flush_now(messages)
                 terminal.display_success("Session saved")
                 terminal.display_success("Goodbye!")
                 break
             
             # Check for special commands first
-            handled, messages = process_command(user_input, messages)
+            handled, messages = process_command(user_input, messages, session_writer)
             if handled:
                 continue
                 
             # Process the command with terminal feedback
             with terminal.show_spinner("AI is thinking..."):
                 messages = process_prompt(user_input, messages=messages, terminal=terminal)
+            session_writer.mark_dirty(messages)
             print()  # Add spacing between responses
             
         except (EOFError, KeyboardInterrupt):
             # Save session before exiting on Ctrl+C - Slice 4 feature
-            save_session_with_metadata(messages)
+            session_writer.flush_now(messages)
             terminal.display_success("Session saved")
             print("\nGoodbye!")
             break
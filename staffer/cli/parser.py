@@ -0,0 +1,43 @@
+"""Command-line argument parsing for Staffer.
+
+Kept free of google.genai imports so --help and --version return instantly.
+"""
+
+import argparse
+
+
+def build_parser():
+    """Build the staffer argument parser."""
+    parser = argparse.ArgumentParser(
+        description="Staffer - AI coding agent that works in any directory",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""Examples:
+  staffer                           # Start interactive mode (default)
+  staffer "analyze this codebase"   # Single command mode
+  staffer "fix the bug in main.py" --verbose
+  staffer "what changed?" --no-cache # Always ask the model, skip cached responses
+  staffer --interactive             # Explicit interactive mode
+
+Interactive Mode Features:
+  • Rich terminal interface with syntax highlighting
+  • Smart prompts showing directory and message count: staffer ~/project [5 msgs]>
+  • Up/down arrow keys for command history navigation
+  • Session commands: /reset, /session, /help
+  • Directory change detection (prompts when switching folders)
+  • Auto-save conversations, persistent command history
+  • Visual feedback: ✅ success, ⚠️ warnings, processing spinners
+  • Function call indicators showing what AI is doing
+  • Type 'exit' or 'quit' to save and quit
+
+Terminal Experience:
+  • Enhanced mode: Rich UI when prompt-toolkit/rich/yaspin available
+  • Basic mode: Clean fallback that works everywhere
+  • Automatic detection and graceful fallback"""
+    )
+    parser.add_argument("prompt", nargs='?', help="The task or question for the AI agent")
+    parser.add_argument("--verbose", action="store_true", help="Show detailed function call information")
+    parser.add_argument("--interactive", action="store_true", help="Start interactive mode")
+    parser.add_argument("--no-cache", action="store_true", help="Always call the model instead of reusing cached responses")
+    parser.add_argument("--version", action="version", version="Staffer 0.2.0")
+
+    return parser
@@ -0,0 +1,163 @@
+"""Bound the conversation history sent to the model on each turn."""
+
+import os
+
+from google.genai import types
+
+from .types_helpers import function_response_part
+
+# Characters kept from each end of an old, oversized tool result
+KEEP_HEAD = 200
+KEEP_TAIL = 200
+
+# Tool results older than the last KEEP_LAST_N messages are cut above MAX_TOOL_CHARS
+MAX_TOOL_CHARS = 4000
+KEEP_LAST_N = 8
+
+
+def _shorten(value, max_chars):
+    """Cut long strings down to their head and tail; leave everything else alone."""
+    if isinstance(value, str) and len(value) > max_chars:
+        return f"{value[:KEEP_HEAD]}...[truncated]...{value[-KEEP_TAIL:]}"
+    return value
+
+
+def _trim_tool_message(message, max_chars):
+    """Return message with oversized function results shortened, or message itself if none are."""
+    new_parts = []
+    changed = False
+    for part in message.parts:
+        function_response = part.function_response
+        if function_response and isinstance(function_response.response, dict):
+            response = {key: _shorten(value, max_chars) for key, value in function_response.response.items()}
+            if any(response[key] is not value for key, value in function_response.response.items()):
+                part = function_response_part(function_response.name, response)
+                changed = True
+        new_parts.append(part)
+    if not changed:
+        return message
+    return types.Content(role=message.role, parts=new_parts)
+
+
+def trim_messages(messages, max_tool_chars=MAX_TOOL_CHARS, keep_last_n=KEEP_LAST_N):
+    """Shorten tool results older than the last keep_last_n messages.
+
+    Tool output (file contents, command output) dominates the prompt and is
+    resent on every turn, so old results over max_tool_chars keep only their
+    head and tail. User and model messages are never touched, and the input
+    list and its messages are not modified.
+    """
+    cutoff = len(messages) - keep_last_n
+    if cutoff <= 0:
+        return messages
+
+    trimmed = []
+    for index, message in enumerate(messages):
+        if index < cutoff and getattr(message, 'role', None) == "tool" and getattr(message, 'parts', None):
+            message = _trim_tool_message(message, max_tool_chars)
+        trimmed.append(message)
+    return trimmed
+
+
+# Results shorter than this aren't worth replacing with a reference
+MIN_DEDUP_CHARS = 200
+
+
+def dedup_tool_results(messages, max_tool_chars=MAX_TOOL_CHARS, keep_last_n=KEEP_LAST_N):
+    """Replace tool results that are repeated later in the history with a short note.
+
+    Re-reading the same file or listing the same directory produces identical
+    output turn after turn. Only the most recent copy is sent in full; earlier
+    copies point at it. A later copy that trim_messages will truncate (same
+    max_tool_chars and keep_last_n) is never pointed at, so earlier copies
+    stay as they are. The input list and its messages are not modified.
+    """
+    cutoff = len(messages) - keep_last_n
+    seen = set()
+    deduped = []
+    for index in range(len(messages) - 1, -1, -1):
+        message = messages[index]
+        if getattr(message, 'role', None) == "tool" and getattr(message, 'parts', None):
+            new_parts = []
+            changed = False
+            for part in message.parts:
+                function_response = part.function_response
+                result = None
+                if function_response and isinstance(function_response.response, dict):
+                    result = function_response.response.get("result")
+                if isinstance(result, str) and len(result) >= MIN_DEDUP_CHARS:
+                    # str caches its own hash, so keying on the text itself is cheap
+                    key = (function_response.name, result)
+                    if key in seen:
+                        part = function_response_part(
+                            function_response.name,
+                            {"result": f"[identical to a later {function_response.name} result]"},
+                        )
+                        changed = True
+                    elif index >= cutoff or len(result) <= max_tool_chars:
+                        # Only a copy that will be sent whole can be referred to
+                        seen.add(key)
+                new_parts.append(part)
+            if changed:
+                message = types.Content(role=message.role, parts=new_parts)
+        deduped.append(message)
+    deduped.reverse()
+    return deduped
+
+
+# Functions whose latest result for a file makes earlier ones obsolete
+PATH_KEYED_FUNCTIONS = frozenset({"get_file_content", "write_file"})
+
+
+def supersede_file_results(messages):
+    """Replace results for a file that a later call to the same function touched again.
+
+    Only the latest get_file_content or write_file result per file_path is
+    sent in full; earlier ones become a short note. Tool results are paired
+    with the model message just before them, whose function calls are in the
+    same order. The input list and its messages are not modified.
+    """
+    # Pair each tool message with the call args of the model message before it
+    call_args = {}
+    previous = None
+    for index, message in enumerate(messages):
+        if getattr(message, 'role', None) == "tool" and getattr(previous, 'role', None) == "model" and previous.parts:
+            call_args[index] = [part.function_call for part in previous.parts if part.function_call]
+        previous = message
+
+    seen = set()
+    superseded = list(messages)
+    for index in sorted(call_args, reverse=True):
+        message = messages[index]
+        calls = call_args[index]
+        new_parts = []
+        changed = False
+        for position, part in enumerate(message.parts or []):
+            function_response = part.function_response
+            function_call = calls[position] if position < len(calls) else None
+            if (function_response and function_call
+                    and function_response.name in PATH_KEYED_FUNCTIONS
+                    and function_call.name == function_response.name):
+                file_path = (function_call.args or {}).get("file_path")
+                key = (function_response.name, os.path.normpath(file_path)) if isinstance(file_path, str) else None
+                if key in seen:
+                    part = function_response_part(
+                        function_response.name,
+                        {"result": f"[superseded by a later {function_response.name} of {file_path}]"},
+                    )
+                    changed = True
+                elif key is not None:
+                    seen.add(key)
+            new_parts.append(part)
+        if changed:
+            superseded[index] = types.Content(role=message.role, parts=new_parts)
+    return superseded
+
+
+def request_view(messages):
+    """The history as it should be sent to the model this turn.
+
+    Superseded file results and repeated results are collapsed to notes and
+    old oversized results are trimmed; the caller's history stays complete.
+    """
+    return trim_messages(dedup_tool_results(supersede_file_results(messages)))
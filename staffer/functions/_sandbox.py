@@ -0,0 +1,18 @@
+"""Sandbox check shared by the file functions."""
+
+import os
+
+
+def inside(working_directory, path):
+    """Resolve path against the working directory and report whether it stays inside it.
+
+    Returns (ok, absolute_path). Uses commonpath so /tmp/foobar is not
+    mistaken for a child of /tmp/foo.
+    """
+    working_dir_abs_path = os.path.realpath(working_directory)
+    abs_path = os.path.realpath(os.path.join(working_dir_abs_path, path))
+    try:
+        return os.path.commonpath([working_dir_abs_path, abs_path]) == working_dir_abs_path, abs_path
+    except ValueError:
+        # Different drives on Windows
+        return False, abs_path
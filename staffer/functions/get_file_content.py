@@ -1,21 +1,27 @@
 import os
 from google.genai import types
+from ._sandbox import inside
+
+MAX_CHARS = 10000
 
 def get_file_content(working_directory, file_path):
-    working_dir_abs_path = os.path.abspath(working_directory)
-    file_abs_path = os.path.abspath(os.path.join(working_dir_abs_path, file_path))
-    if not file_abs_path.startswith(working_dir_abs_path):
+    ok, file_abs_path = inside(working_directory, file_path)
+    if not ok:
         return f'Error: Cannot read "{file_path}" as it is outside the permitted working directory'
     if not os.path.isfile(file_abs_path):
         return f'Error: File not found or is not a regular file: "{file_path}"'
     try:
-        with open(file_abs_path, 'r') as file:
-            MAX_CHARS = 10000
-            file_content_string = file.read(MAX_CHARS)
-            if len(file_content_string) == MAX_CHARS:
-                return f'{file_content_string}...File "{file_path}" truncated at {MAX_CHARS} characters'
-            else:
-                return file_content_string
+        fd = os.open(file_abs_path, os.O_RDONLY)
+        try:
+            file_size = os.fstat(fd).st_size
+            # UTF-8 uses at most 4 bytes per character, so this always covers MAX_CHARS
+            raw = os.read(fd, MAX_CHARS * 4)
+        finally:
+            os.close(fd)
+        file_content_string = raw.decode('utf-8', errors='replace')
+        if len(file_content_string) > MAX_CHARS or file_size > len(raw):
+            return f'{file_content_string[:MAX_CHARS]}...File "{file_path}" truncated at {MAX_CHARS} characters'
+        return file_content_string
     except Exception as e:
         return f'Error: {e}'
     
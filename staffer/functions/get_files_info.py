@@ -1,14 +1,11 @@
 import os
 from google.genai import types
+from ._sandbox import inside
 
 def get_files_info(working_directory, directory=None):
-    working_dir_abs_path = os.path.abspath(working_directory)
-    target_dir = working_dir_abs_path
     # If directory is None, use the working directory as the directory
-    if directory:
-        target_dir = os.path.abspath(os.path.join(working_dir_abs_path, directory))
-
-    if not target_dir.startswith(working_dir_abs_path):
+    ok, target_dir = inside(working_directory, directory or "")
+    if not ok:
         return f'Error: Cannot list "{directory}" as it is outside the permitted working directory'
     if not os.path.isdir(target_dir):
         return f'Error: "{directory}" is not a directory'
@@ -1,24 +1,31 @@
 import os
 import subprocess
+import sys
 from google.genai import types
+from ._sandbox import inside
 
 def run_python_file(working_directory, file_path):
-    working_dir_abs_path = os.path.abspath(working_directory)
-    file_abs_path = os.path.abspath(os.path.join(working_dir_abs_path, file_path))
-    if not file_abs_path.startswith(working_dir_abs_path):
+    ok, file_abs_path = inside(working_directory, file_path)
+    if not ok:
         return f'Error: Cannot execute "{file_path}" as it is outside the permitted working directory'
     if not os.path.exists(file_abs_path):
         return f'Error: File "{file_path}" not found.'
     if not file_abs_path.endswith('.py'):
         return f'Error: File "{file_path}" is not a Python file.'
     try:
-        args = ["python", file_abs_path]
+        # Run with the same interpreter as staffer rather than whatever "python" is on PATH
+        args = [sys.executable, file_abs_path]
         result = subprocess.run(args, timeout=30, capture_output=True, text=True)
+        if not result.stdout and not result.stderr:
+            output = "No output produced"
+        else:
+            output = f'STDOUT: {result.stdout}\nSTDERR: {result.stderr}'
+        # Keep the output on failure so the AI can see what went wrong
         if result.returncode != 0:
-            return f"Process exited with code {result.returncode}"
-        elif result.stdout is None:
-            return "No output produced"
-        return f'STDOUT: {result.stdout}\nSTDERR: {result.stderr}'
+            return f"Process exited with code {result.returncode}\n{output}"
+        return output
+    except subprocess.TimeoutExpired:
+        return f'Error: "{file_path}" timed out after 30 seconds'
     except Exception as e:
         return f"Error: executing Python file: {e}"
     
@@ -1,19 +1,25 @@
 import os
 from google.genai import types
+from ._sandbox import inside
 
 def write_file(working_directory, file_path, content):
-    working_dir_abs_path = os.path.abspath(working_directory)
-    file_abs_path = os.path.abspath(os.path.join(working_dir_abs_path, file_path))
-    if not file_abs_path.startswith(working_dir_abs_path):
+    ok, file_abs_path = inside(working_directory, file_path)
+    if not ok:
         return f'Error: Cannot write to "{file_path}" as it is outside the permitted working directory'
-    if not os.path.exists(os.path.dirname(file_abs_path)):
-        try:
-            os.makedirs(os.path.dirname(file_abs_path))
-        except Exception as e:
-            return f'Error: {e}'
     try:
-        with open(file_abs_path, 'w') as file:
-            file.write(content)
+        os.makedirs(os.path.dirname(file_abs_path) or '.', exist_ok=True)
+    except Exception as e:
+        return f'Error: {e}'
+    try:
+        data = memoryview(content.encode('utf-8'))
+        fd = os.open(file_abs_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            # os.write may write less than asked for large buffers, so keep going
+            while data:
+                written = os.write(fd, data)
+                data = data[written:]
+        finally:
+            os.close(fd)
     except Exception as e:
         return f'Error: {e}'
     return f'Successfully wrote to "{file_path}" ({len(content)} characters written)'
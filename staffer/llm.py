@@ -1,16 +1,36 @@
 """LLM client abstraction for dependency injection."""
 
+import functools
 import os
+import time
+import httpx
 from dotenv import load_dotenv
 from google import genai
+from google.genai import types
 
 load_dotenv()
 
+# Seconds to wait for a model response before retrying; override with STAFFER_LLM_TIMEOUT
+DEFAULT_TIMEOUT = 30.0
 
+
+def get_timeout():
+    """Seconds the HTTP client waits on the model before giving up on a request."""
+    return float(os.environ.get("STAFFER_LLM_TIMEOUT", DEFAULT_TIMEOUT))
+
+
+@functools.lru_cache(maxsize=1)
 def _default_client_factory():
-    """Default factory that creates real Google AI client."""
+    """Default factory that creates real Google AI client.
+
+    Cached so every call shares one client and its connection pool. The
+    timeout is enforced by the HTTP transport, so a stalled request is
+    actually aborted rather than left running.
+    """
     api_key = os.environ.get("GEMINI_API_KEY")
-    return genai.Client(api_key=api_key)
+    # HttpOptions.timeout is in milliseconds
+    http_options = types.HttpOptions(timeout=int(get_timeout() * 1000))
+    return genai.Client(api_key=api_key, http_options=http_options)
 
 
 # Client factory - can be replaced for testing
@@ -22,7 +42,83 @@ def get_client():
     return _client_factory()
 
 
+def reset_client():
+    """Drop the cached real client so the next get_client() builds a new one."""
+    _default_client_factory.cache_clear()
+
+
 def set_client_factory(factory):
     """Set a custom client factory (for testing)."""
     global _client_factory
-    _client_factory = factory
\ No newline at end of file
+    _client_factory = factory
+
+
+def generate_with_timeout(client, *, retries=2, backoff=0.5, **kwargs):
+    """Call generate_content, retrying with exponential backoff if a request times out.
+
+    The client's HTTP transport raises once a request stalls past its timeout
+    (see _default_client_factory); after the last retry that surfaces as a
+    TimeoutError.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return client.models.generate_content(**kwargs)
+        except httpx.TimeoutException as exc:
+            if attempt == retries:
+                raise TimeoutError(f"Model did not respond after {retries + 1} attempts") from exc
+            time.sleep(backoff * (2 ** attempt))
+
+
+def _stream_with_retry(client, retries, backoff, **kwargs):
+    """Yield streamed chunks, retrying a stream that times out before its first chunk.
+
+    Once chunks have been handed out a retry would repeat them, so a later
+    timeout is raised as TimeoutError instead.
+    """
+    for attempt in range(retries + 1):
+        started = False
+        try:
+            for chunk in client.models.generate_content_stream(**kwargs):
+                started = True
+                yield chunk
+            return
+        except httpx.TimeoutException as exc:
+            if started:
+                raise TimeoutError("Model stopped responding mid-stream") from exc
+            if attempt == retries:
+                raise TimeoutError(f"Model did not respond after {retries + 1} attempts") from exc
+            time.sleep(backoff * (2 ** attempt))
+
+
+def stream_generate(client, on_text, *, retries=2, backoff=0.5, **kwargs):
+    """Stream generate_content, passing each text chunk to on_text as it arrives.
+
+    Returns one response assembled from the chunks so callers can handle it
+    like a regular generate_content result. Timeouts come from the client's
+    HTTP transport, as for generate_with_timeout.
+    """
+    parts = []
+    text_chunks = []
+    usage_metadata = types.GenerateContentResponseUsageMetadata()
+
+    for chunk in _stream_with_retry(client, retries, backoff, **kwargs):
+        if chunk.usage_metadata:
+            usage_metadata = chunk.usage_metadata
+        if not chunk.candidates or not chunk.candidates[0].content:
+            continue
+        for part in chunk.candidates[0].content.parts or []:
+            if part.text:
+                on_text(part.text)
+                text_chunks.append(part.text)
+            else:
+                # Keep text and function calls in the order they were streamed
+                if text_chunks:
+                    parts.append(types.Part(text="".join(text_chunks)))
+                    text_chunks = []
+                parts.append(part)
+
+    if text_chunks:
+        parts.append(types.Part(text="".join(text_chunks)))
+
+    candidates = [types.Candidate(content=types.Content(role="model", parts=parts))] if parts else []
+    return types.GenerateContentResponse(candidates=candidates, usage_metadata=usage_metadata)
@@ -0,0 +1,144 @@
+"""Content-addressed cache for Gemini generate_content responses."""
+
+import hashlib
+import json
+from collections import OrderedDict
+from pathlib import Path
+
+from google.genai import types
+
+from .llm import generate_with_timeout, stream_generate
+
+# Bounds for the in-memory LRU and the on-disk cache directory
+MAX_MEMORY_ENTRIES = 256
+MAX_DISK_ENTRIES = 256
+
+_memory_cache = OrderedDict()
+_cache_enabled = True
+
+
+def get_cache_dir():
+    """Get the directory that holds cached responses."""
+    return Path.home() / ".staffer" / "cache"
+
+
+def set_cache_enabled(enabled):
+    """Turn response caching on or off (used by --no-cache)."""
+    global _cache_enabled
+    _cache_enabled = enabled
+
+
+def clear_cache():
+    """Drop every cached response, in memory and on disk."""
+    _memory_cache.clear()
+    cache_dir = get_cache_dir()
+    if not cache_dir.exists():
+        return
+    for entry in cache_dir.glob("*.json"):
+        try:
+            entry.unlink()
+        except OSError:
+            pass
+
+
+def request_key(model, contents, config):
+    """Hash a request into a cache key, or None if it can't be serialized."""
+    try:
+        payload = json.dumps({
+            "model": model,
+            "contents": [content.model_dump(mode="json", exclude_none=True) for content in contents],
+            "config": config.model_dump(mode="json", exclude_none=True) if config is not None else None,
+        }, sort_keys=True)
+    except (AttributeError, TypeError, ValueError):
+        return None
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=20).hexdigest()
+
+
+def _remember(key, response):
+    """Store a response in the in-memory LRU."""
+    _memory_cache[key] = response
+    _memory_cache.move_to_end(key)
+    while len(_memory_cache) > MAX_MEMORY_ENTRIES:
+        _memory_cache.popitem(last=False)
+
+
+def _load_from_disk(key):
+    """Load a cached response from disk, or None on a miss."""
+    cache_file = get_cache_dir() / f"{key}.json"
+    try:
+        return types.GenerateContentResponse.model_validate_json(cache_file.read_text())
+    except (OSError, ValueError):
+        # Missing or corrupted entry counts as a miss
+        return None
+
+
+def _save_to_disk(key, response):
+    """Write a response to disk, evicting the oldest entries past the cap."""
+    cache_dir = get_cache_dir()
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        (cache_dir / f"{key}.json").write_text(response.model_dump_json(exclude_none=True))
+
+        entries = sorted(cache_dir.glob("*.json"), key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:-MAX_DISK_ENTRIES]:
+            entry.unlink()
+    except OSError:
+        # Caching is best effort; never fail the request because of it
+        pass
+
+
+def _lookup(key):
+    """Find a cached response in memory, then on disk; None on a miss."""
+    response = _memory_cache.get(key)
+    if response is not None:
+        _memory_cache.move_to_end(key)
+        return response
+
+    response = _load_from_disk(key)
+    if response is not None:
+        _remember(key, response)
+    return response
+
+
+def _store(key, response):
+    """Cache a response, if it is one worth replaying."""
+    # Only real SDK responses with candidates are worth replaying
+    if isinstance(response, types.GenerateContentResponse) and response.candidates:
+        _remember(key, response)
+        _save_to_disk(key, response)
+
+
+def cached_generate(client, model, contents, config):
+    """Call generate_content (with timeout and retry), reusing responses for identical requests."""
+    key = request_key(model, contents, config) if _cache_enabled else None
+    if key is None:
+        return generate_with_timeout(client, model=model, contents=contents, config=config)
+
+    response = _lookup(key)
+    if response is not None:
+        return response
+
+    response = generate_with_timeout(client, model=model, contents=contents, config=config)
+    _store(key, response)
+    return response
+
+
+def cached_stream_generate(client, on_text, model, contents, config):
+    """Stream a response through on_text, reusing responses for identical requests.
+
+    A cached response is replayed by passing its text parts to on_text, so
+    callers see the same output whether or not the model was called.
+    """
+    key = request_key(model, contents, config) if _cache_enabled else None
+    if key is not None:
+        response = _lookup(key)
+        if response is not None:
+            for part in response.candidates[0].content.parts or []:
+                if part.text:
+                    on_text(part.text)
+            return response
+
+    response = stream_generate(client, on_text, model=model, contents=contents, config=config)
+    if key is not None:
+        _store(key, response)
+    return response
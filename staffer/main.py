@@ -1,10 +1,18 @@
+import functools
 import os
-import argparse
+import re
 from pathlib import Path
 from google.genai import types
 import sys
-from .available_functions import get_available_functions, call_function
+from concurrent.futures import ThreadPoolExecutor
+from .available_functions import get_available_functions, call_function, READ_ONLY_FUNCTIONS
 from .llm import get_client
+from .llm_cache import cached_generate, cached_stream_generate, set_cache_enabled
+from .context import request_view
+from .types_helpers import user_text, function_response_part
+from .session import message_char_count
+from ._idcache import get_or_compute
+from .cli.parser import build_parser
 
 def _is_ancestor(path: Path, cwd: Path) -> bool:
     """Check if path is an ancestor of cwd (parent, grandparent, etc)."""
@@ -14,75 +22,135 @@ def _is_ancestor(path: Path, cwd: Path) -> bool:
         return False
 
 
-def prune_stale_dir_msgs(msgs, cwd: Path, max_messages=120):
-    """Filter stale directory context with ancestor path detection. Returns new list, no mutation."""
-    cwd_str = str(cwd)
-    
-    # Get all ancestor paths to filter out
+@functools.lru_cache(maxsize=32)
+def _ancestors(cwd_str):
+    """Ancestors of cwd from nearest to top-level, excluding the filesystem root."""
     ancestor_paths = []
-    current = cwd.parent
-    while current != current.parent:  # Stop at filesystem root
-        ancestor_paths.append(str(current))
-        current = current.parent
+    current = os.path.dirname(cwd_str)
+    while current != os.path.dirname(current):  # Stop at filesystem root
+        ancestor_paths.append(current)
+        current = os.path.dirname(current)
+    return tuple(ancestor_paths)
+
+
+@functools.lru_cache(maxsize=32)
+def _ancestor_reference_pattern(cwd_str):
+    """Compile one regex matching text that points at an ancestor of cwd.
+
+    Matches "in <ancestor>" anywhere (which also covers "Working in" and
+    "Files in") or text ending with an ancestor path. Returns None when cwd
+    has no ancestors below the filesystem root.
+    """
+    ancestor_paths = _ancestors(cwd_str)
+    if not ancestor_paths:
+        return None
+
+    alternation = "|".join(re.escape(path) for path in ancestor_paths)
+    return re.compile(f"in (?:{alternation})|(?:{alternation})\\Z")
+
+
+# (id(message), cwd_str) -> (weakref to message, stale?); see _idcache.get_or_compute
+_stale_cache = {}
+
+
+def _files_info_result(m):
+    """The result text of a get_files_info tool message, or None for anything else."""
+    try:
+        fr = m.parts[0].function_response
+        if fr is None or fr.name != "get_files_info":
+            return None
+        return str(fr.response.get("result", ""))
+    except (AttributeError, IndexError, TypeError):
+        return None
+
+
+def _is_tool_response(m):
+    """Whether a message answers function calls made in the message before it."""
+    return m.role == "tool" or any(part.function_response for part in m.parts or ())
+
+
+def _is_stale(m, cwd_str, ancestor_pattern, top_ancestor):
+    """Whether a message carries directory context that no longer applies to cwd_str."""
+    if m.role == "model" and m.parts:
+        text = m.parts[0].text or ""
+        
+        # Drop old cwd headers that don't match current directory
+        if "[Working directory:" in text and cwd_str not in text:
+            return True
+            
+        # Drop messages that specifically reference working IN ancestor paths
+        if ancestor_pattern is not None and cwd_str not in text:
+            return ancestor_pattern.search(text) is not None
+            
+    # Enhanced tool response filtering for ancestor directories
+    elif m.role == "tool" and top_ancestor is not None:
+        result = _files_info_result(m)
+        # Drop tool responses that start with ancestor paths but not current path
+        if result is not None and result.startswith(top_ancestor) and not result.startswith(cwd_str):
+            return True
+    
+    return False
+
+
+def prune_stale_dir_msgs(msgs, cwd, max_messages=120, token_budget=900_000):
+    """Filter stale directory context with ancestor path detection. Returns new list, no mutation.
+
+    Decisions are remembered per message and cwd, so history that was already
+    checked on an earlier turn isn't scanned again. The result is capped at
+    max_messages and at roughly token_budget tokens (about 4 characters per
+    token), keeping the most recent messages and the opening user message;
+    the cut never separates a function call from its responses.
+    """
+    cwd_str = os.fspath(cwd)
+    ancestor_pattern = _ancestor_reference_pattern(cwd_str)
+    
+    # Ancestors form a chain of prefixes, so starting with any of them is the
+    # same as starting with the top-level one (e.g. /home for /home/user/project)
+    ancestor_paths = _ancestors(cwd_str)
+    top_ancestor = ancestor_paths[-1] if ancestor_paths else None
     
     kept = []
     for m in msgs:
-        skip_message = False
+        stale = get_or_compute(
+            _stale_cache, m,
+            lambda message: _is_stale(message, cwd_str, ancestor_pattern, top_ancestor),
+            key=(id(m), cwd_str),
+        )
         
-        if m.role == "model" and m.parts:
-            text = m.parts[0].text or ""
-            
-            # Drop old cwd headers that don't match current directory
-            if "[Working directory:" in text and cwd_str not in text:
-                skip_message = True
-                
-            # Drop messages that specifically reference working IN ancestor paths
-            else:
-                for ancestor_path in ancestor_paths:
-                    # Only filter if it looks like a working directory reference
-                    if (cwd_str not in text and 
-                        (text.endswith(str(ancestor_path)) or 
-                         f"in {ancestor_path}" in text or
-                         f"Working in {ancestor_path}" in text or
-                         f"Files in {ancestor_path}" in text)):
-                        skip_message = True
-                        break
-                
-        # Enhanced tool response filtering for ancestor directories
-        elif m.role == "tool" and m.parts:
-            fc = getattr(m.parts[0], "function_response", None)
-            if fc and getattr(fc, "name", "") == "get_files_info":
-                result = str(getattr(fc, "response", {}).get("result", ""))
-                # Drop tool responses that start with ancestor paths but not current path
-                for ancestor_path in ancestor_paths:
-                    if result.startswith(ancestor_path) and not result.startswith(cwd_str):
-                        skip_message = True
-                        break
-        
-        if not skip_message:
+        if not stale:
             kept.append(m)
     
     # Hard limit on message count to prevent token overflow
     if len(kept) > max_messages:
         # Keep most recent messages to preserve context
-        kept = kept[-max_messages:]
+        del kept[:-max_messages]
+    
+    # One huge tool result can outweigh a hundred short turns, so also cap by size.
+    # A newest message that alone exceeds the budget is dropped along with the rest;
+    # sending it would fail anyway.
+    estimated_tokens = 0
+    for start in range(len(kept) - 1, -1, -1):
+        estimated_tokens += message_char_count(kept[start]) // 4
+        if estimated_tokens > token_budget:
+            first = kept[0]
+            # Never start on tool responses whose function call was cut off;
+            # the API rejects a response without its call
+            cut = start + 1
+            while cut < len(kept) and _is_tool_response(kept[cut]):
+                cut += 1
+            del kept[:cut]
+            # The opening request usually frames the whole conversation
+            if getattr(first, "role", None) == "user":
+                kept.insert(0, first)
+            break
     
     return kept
 
 
-def build_prompt(messages, working_directory=None):
-    """Build system prompt with working directory and function info."""
-    if working_directory is None:
-        working_directory = Path.cwd()
-    else:
-        working_directory = Path(working_directory)
-    
-    # Double header weight for salience without per-turn spam
-    cwd_header_1 = f"[cwd: {working_directory}]"
-    cwd_header_2 = f"⚠️ You are now working in {working_directory}. Always answer with this full path."
-    
-    return f"""{cwd_header_1}
-{cwd_header_2}
+# Built once at import; only the working directory changes between prompts.
+# The doubled cwd header gives it salience without per-turn spam.
+SYSTEM_PROMPT_TEMPLATE = """[cwd: {working_directory}]
+⚠️ You are now working in {working_directory}. Always answer with this full path.
 
 You are a helpful AI coding agent working in: {working_directory}
 
@@ -100,12 +168,64 @@ All paths you provide should be relative to the working directory: {working_dire
 You have access to these functions - use them confidently to explore directories, read files, and accomplish tasks."""
 
 
-def process_prompt(prompt, verbose=False, messages=None, terminal=None):
-    """Process a single prompt using the AI agent."""
+@functools.lru_cache(maxsize=8)
+def _build_prompt_cached(working_directory):
+    return SYSTEM_PROMPT_TEMPLATE.format(working_directory=Path(working_directory))
+
+
+def build_prompt(messages, working_directory=None):
+    """Build system prompt with working directory and function info.
+
+    The prompt depends only on the working directory, so it is built once
+    per directory; messages is accepted for compatibility but not used.
+    """
+    if working_directory is None:
+        working_directory = Path.cwd()
+    
+    return _build_prompt_cached(str(working_directory))
+
+
+def run_function_calls(function_calls, working_directory, verbose=False):
+    """Execute a turn's function calls, returning results in call order.
+
+    Read-only calls are independent of each other, so when a turn contains
+    only those they run concurrently. Anything that writes or executes keeps
+    the original sequential order.
+    """
+    if len(function_calls) > 1 and all(fc.name.lower() in READ_ONLY_FUNCTIONS for fc in function_calls):
+        with ThreadPoolExecutor(max_workers=min(len(function_calls), 8)) as executor:
+            return list(executor.map(
+                lambda fc: call_function(fc, working_directory, verbose=verbose),
+                function_calls
+            ))
+    return [call_function(fc, working_directory, verbose=verbose) for fc in function_calls]
+
+
+def stream_to_stdout(client, **kwargs):
+    """Print a model turn as it streams in (or is replayed from the cache) and return the assembled response."""
+    printed = []
+
+    def print_chunk(text):
+        printed.append(text)
+        print(text, end="", flush=True)
+
+    res = cached_stream_generate(client, print_chunk, **kwargs)
+    if printed:
+        print()  # End the streamed line
+    return res
+
+
+def process_prompt(prompt, verbose=False, messages=None, terminal=None, stream=False):
+    """Process a single prompt using the AI agent.
+    
+    With stream=True (and no terminal UI) model text is printed as it arrives
+    instead of after the whole turn completes.
+    """
     if messages is None:
         messages = []
-    working_directory = Path(os.getcwd())
-    available_functions = get_available_functions(str(working_directory))
+    # Plain string throughout; every consumer either wants a str or accepts one
+    working_directory = os.getcwd()
+    available_functions = get_available_functions(working_directory)
 
     if verbose:
         print(f"Working directory: {working_directory}")
@@ -116,29 +236,39 @@ def process_prompt(prompt, verbose=False, messages=None, terminal=None):
     system_prompt = build_prompt(clean_messages, working_directory)
 
     # Add current user prompt
-    current_message = types.Content(
-        role="user",
-        parts=[types.Part(text=prompt)]
-    )
+    current_message = user_text(prompt)
 
-    # Build conversation for LLM (history + current prompt)
-    conversation_for_llm = clean_messages + [current_message]
+    # Build conversation for LLM (history + current prompt); prune already
+    # returned a fresh list, so extend it in place instead of copying it again
+    conversation_for_llm = clean_messages
+    conversation_for_llm.append(current_message)
 
     client = get_client()
     
+    # Tools and system prompt are fixed for the whole prompt, so build the config once
+    config = types.GenerateContentConfig(
+        tools=[available_functions],
+        system_instruction=system_prompt
+    )
+
     for i in range(20):
         function_called = False
-        res = client.models.generate_content(
-            model="gemini-2.0-flash-001",
-            contents=conversation_for_llm,
-            config=types.GenerateContentConfig(
-                tools=[available_functions],
-                system_instruction=system_prompt
-            )   
-        )    
-
-        promptTokens = res.usage_metadata.prompt_token_count
-        responseTokens = res.usage_metadata.candidates_token_count
+        # Stale, repeated and old tool output is shortened for the request; the returned history keeps it whole
+        request_contents = request_view(conversation_for_llm)
+        if stream and not terminal:
+            res = stream_to_stdout(
+                client,
+                model="gemini-2.0-flash-001",
+                contents=request_contents,
+                config=config
+            )
+        else:
+            res = cached_generate(
+                client,
+                model="gemini-2.0-flash-001",
+                contents=request_contents,
+                config=config
+            )
 
         if res.candidates:
             for candidate in res.candidates:
@@ -147,25 +277,21 @@ def process_prompt(prompt, verbose=False, messages=None, terminal=None):
                 
                 # Collect all function responses for this turn
                 function_response_parts = []
-                for part in candidate.content.parts:
-                    if part.function_call:
-                        function_called = True
-                        # Display function call indicator if terminal provided
-                        if terminal:
-                            terminal.display_function_call(part.function_call.name)
-                        if verbose:
-                            function_call_result = call_function(part.function_call, working_directory, verbose=True)
-                        else:
-                            function_call_result = call_function(part.function_call, working_directory)
+                function_calls = [part.function_call for part in candidate.content.parts if part.function_call]
+                if function_calls:
+                    function_called = True
+                    # Display function call indicators if terminal provided
+                    if terminal:
+                        for function_call in function_calls:
+                            terminal.display_function_call(function_call.name)
+                    results = run_function_calls(function_calls, working_directory, verbose=verbose)
+                    for function_call, function_call_result in zip(function_calls, results):
                         if not function_call_result.parts[0].function_response.response:
                             sys.exit(1)
-                        else:
-                            function_response_parts.append(
-                                types.Part(function_response=types.FunctionResponse(
-                                    name=part.function_call.name,
-                                    response=function_call_result.parts[0].function_response.response
-                                ))
-                            )
+                        function_response_parts.append(function_response_part(
+                            function_call.name,
+                            function_call_result.parts[0].function_response.response,
+                        ))
                 
                 # Add all function responses as a single tool message
                 if function_response_parts:
@@ -177,51 +303,28 @@ def process_prompt(prompt, verbose=False, messages=None, terminal=None):
             if not function_called:
                 if terminal:
                     terminal.display_ai_response(res.text)
-                else:
+                elif not stream:
                     print(f"-> {res.text}")
                 break
-        i+=1
 
     if verbose:
-        print(f"Prompt tokens: {promptTokens}")
-        print(f"Response tokens: {responseTokens}")
+        # Only the last response's usage is reported, so read it once here
+        usage = res.usage_metadata
+        print(f"Prompt tokens: {usage.prompt_token_count}")
+        print(f"Response tokens: {usage.candidates_token_count}")
     
     # Return conversation_for_llm which now contains all the new responses
     return conversation_for_llm
 
 
 def main():
-    parser = argparse.ArgumentParser(
-        description="Staffer - AI coding agent that works in any directory",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""Examples:
-  staffer                           # Start interactive mode (default)
-  staffer "analyze this codebase"   # Single command mode
-  staffer "fix the bug in main.py" --verbose
-  staffer --interactive             # Explicit interactive mode
-
-Interactive Mode Features:
-  • Rich terminal interface with syntax highlighting
-  • Smart prompts showing directory and message count: staffer ~/project [5 msgs]>
-  • Up/down arrow keys for command history navigation
-  • Session commands: /reset, /session, /help
-  • Directory change detection (prompts when switching folders)
-  • Auto-save conversations, persistent command history
-  • Visual feedback: ✅ success, ⚠️ warnings, processing spinners
-  • Function call indicators showing what AI is doing
-  • Type 'exit' or 'quit' to save and quit
-
-Terminal Experience:
-  • Enhanced mode: Rich UI when prompt-toolkit/rich/yaspin available
-  • Basic mode: Clean fallback that works everywhere
-  • Automatic detection and graceful fallback"""
-    )
-    parser.add_argument("prompt", nargs='?', help="The task or question for the AI agent")
-    parser.add_argument("--verbose", action="store_true", help="Show detailed function call information")
-    parser.add_argument("--interactive", action="store_true", help="Start interactive mode")
-    parser.add_argument("--version", action="version", version="Staffer 0.2.0")
-    
-    args = parser.parse_args()
+    run(build_parser().parse_args())
+
+
+def run(args):
+    """Run staffer for already-parsed command-line arguments."""
+    if args.no_cache:
+        set_cache_enabled(False)
     
     # Handle interactive mode - either explicit flag or no prompt provided
     if args.interactive or not args.prompt:
@@ -230,7 +333,7 @@ Terminal Experience:
         return
     
     # Single command mode with prompt
-    process_prompt(args.prompt, args.verbose)
+    process_prompt(args.prompt, args.verbose, stream=True)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,10 +1,21 @@
 """Session persistence for Staffer - save and load conversation history."""
 
+import gzip
 import json
 import os
+import zlib
+import tempfile
+import threading
+import uuid
 from datetime import datetime
 from pathlib import Path
-from google.genai import types
+from ._idcache import get_or_compute
+from .types_helpers import text_content, model_text
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 def get_session_file_path():
@@ -13,14 +24,62 @@ def get_session_file_path():
     return staffer_dir / "current_session.json"
 
 
+# Sessions larger than this are written gzip-compressed to a separate .gz file;
+# small ones stay readable JSON under the usual name
+COMPRESS_THRESHOLD = 1024 * 1024
+
+# Journal appends allowed before SessionWriter rewrites the full session file
+JOURNAL_COMPACT_EVERY = 50
+
+# Roles Google AI accepts in conversation history
+_VALID_ROLES = frozenset(("user", "model", "tool"))
+
+# Sentinel for attribute probes, so missing attributes don't go through hasattr's exception path
+_MISSING = object()
+
+# id(message) -> (weakref, char count); see _idcache.get_or_compute
+_char_counts = {}
+
+
+def message_char_count(message):
+    """Size of a message in characters, computed once per message object.
+
+    Messages aren't edited once they are in the history, so the count stays
+    valid for the object's lifetime.
+    """
+    return get_or_compute(_char_counts, message, lambda m: len(str(m)))
+
+
+def get_journal_path(session_path):
+    """Get the journal of messages appended since the session file was last rewritten."""
+    if not isinstance(session_path, Path):
+        session_path = Path(session_path)
+    return session_path.with_suffix(".jsonl")
+
+
+def get_compressed_path(session_path):
+    """Get the file a session too large for plain JSON is written to."""
+    return session_path.with_name(session_path.name + ".gz")
+
+
+def _encode(data, indent=False):
+    """Encode data as JSON bytes, with orjson when it is available."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2) if indent else orjson.dumps(data)
+    return (json.dumps(data, indent=2) if indent else json.dumps(data)).encode('utf-8')
+
+
+def _decode(raw):
+    """Decode JSON bytes, with orjson when it is available."""
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
 def create_working_directory_message():
     """Create a system message with current working directory information."""
     current_dir = os.getcwd()
     timestamp = datetime.now().isoformat()
-    return types.Content(
-        role="model",  # Use model role since Google AI doesn't support system role
-        parts=[types.Part(text=f"[Working directory: {current_dir}] (captured {timestamp})")]
-    )
+    # Use model role since Google AI doesn't support system role
+    return model_text(f"[Working directory: {current_dir}] (captured {timestamp})")
 
 
 def serialize_message(message):
@@ -31,47 +90,57 @@ def serialize_message(message):
     - Tool messages: Convert to readable function execution summary
     - Already serialized dicts: Pass through unchanged
     """
-    if hasattr(message, 'role') and hasattr(message, 'parts'):
-        # Handle tool messages by converting function response to readable text
-        if message.role == "tool":
-            for part in message.parts:
-                if hasattr(part, 'function_response') and part.function_response:
-                    # Extract actual response data for AI visibility
-                    response_data = part.function_response.response
-                    function_name = part.function_response.name
-                    
-                    # Convert response to readable text based on structure
-                    if isinstance(response_data, dict) and "result" in response_data:
-                        result = response_data["result"]
-                        if isinstance(result, list):
-                            # List of items (like file names) - make comma-separated
-                            result_text = ", ".join(str(item) for item in result)
-                        else:
-                            # String or other data
-                            result_text = str(result)
+    role = getattr(message, 'role', _MISSING)
+    parts = getattr(message, 'parts', _MISSING)
+    if role is _MISSING or parts is _MISSING:
+        # If it's already a dict, return as-is
+        return message
+    
+    # Handle tool messages by converting function response to readable text
+    if role == "tool":
+        for part in parts or ():
+            function_response = getattr(part, 'function_response', None)
+            if function_response:
+                # Extract actual response data for AI visibility
+                response_data = function_response.response
+                function_name = function_response.name
+                
+                # Convert response to readable text based on structure
+                if isinstance(response_data, dict) and "result" in response_data:
+                    result = response_data["result"]
+                    if isinstance(result, list):
+                        # List of items (like file names) - make comma-separated
+                        result_text = ", ".join(str(item) for item in result)
                     else:
-                        # Fallback for other response formats
-                        result_text = str(response_data)
-                    
-                    return {
-                        "role": "model",  # Convert tool response to model message
-                        "text": f"Function {function_name} result: {result_text}"
-                    }
-            return None  # Skip tool messages without valid function responses
-            
-        # Extract text from parts for user/model messages
-        text_parts = []
-        for part in message.parts:
-            if hasattr(part, 'text') and part.text:
-                text_parts.append(part.text)
+                        # String or other data
+                        result_text = str(result)
+                else:
+                    # Fallback for other response formats
+                    result_text = str(response_data)
+                
+                return {
+                    "role": "model",  # Convert tool response to model message
+                    "text": f"Function {function_name} result: {result_text}"
+                }
+        return None  # Skip tool messages without valid function responses
         
-        return {
-            "role": message.role,
-            "text": " ".join(text_parts) if text_parts else ""
-        }
+    # Extract text from parts for user/model messages
+    text_parts = []
+    for part in parts or ():
+        text = getattr(part, 'text', None)
+        if text:
+            text_parts.append(text)
+    
+    # Nearly every message has exactly one text part; skip the join for it
+    if len(text_parts) == 1:
+        text = text_parts[0]
     else:
-        # If it's already a dict, return as-is
-        return message
+        text = " ".join(text_parts)
+    
+    return {
+        "role": role,
+        "text": text
+    }
 
 
 def deserialize_message(data):
@@ -85,24 +154,19 @@ def deserialize_message(data):
     """
     if isinstance(data, dict) and "role" in data and "text" in data:
         # Validate role - Google AI only accepts: user, model, tool
-        valid_roles = {"user", "model", "tool"}
         role = data["role"]
         
         # Convert common invalid roles
         if role == "assistant":
             role = "model"
-        elif role not in valid_roles:
+        elif role not in _VALID_ROLES:
             # Skip messages with invalid roles (system, etc.)
             return None
             
-        return types.Content(
-            role=role,
-            parts=[types.Part(text=data["text"])]
-        )
+        return text_content(role, data["text"])
     elif hasattr(data, 'role') and hasattr(data, 'parts'):
         # If it's already a Content object, validate its role too
-        valid_roles = {"user", "model", "tool"}
-        if hasattr(data, 'role') and data.role in valid_roles:
+        if data.role in _VALID_ROLES:
             return data
         else:
             return None
@@ -124,12 +188,16 @@ def save_session_with_metadata(messages, metadata=None, session_path=None):
         messages: List of message objects to save
         metadata: Optional dict with additional metadata (e.g., {"cwd": "/path"})
         session_path: Optional path to save to (for testing)
+        
+    Returns:
+        str: Snapshot id that journal entries appended to this save must carry
     """
     if session_path is None:
         session_path = get_session_file_path()
     
-    # Always convert to Path object
-    session_path = Path(session_path)
+    # get_session_file_path() already returns a Path; only callers' strings need wrapping
+    if not isinstance(session_path, Path):
+        session_path = Path(session_path)
     
     # Create directory if it doesn't exist
     session_path.parent.mkdir(parents=True, exist_ok=True)
@@ -141,10 +209,11 @@ def save_session_with_metadata(messages, metadata=None, session_path=None):
     # Always add current working directory and timestamp
     metadata["cwd"] = os.getcwd()
     metadata["created"] = datetime.now().isoformat()
+    # Journal entries only count for the snapshot they were appended to
+    metadata["snapshot"] = uuid.uuid4().hex
     
     # Serialize messages before saving, filter out None values
-    serialized_messages = [serialize_message(msg) for msg in messages]
-    filtered_messages = [msg for msg in serialized_messages if msg is not None]
+    filtered_messages = [serialized for msg in messages if (serialized := serialize_message(msg)) is not None]
     
     # Save as new format with metadata
     session_data = {
@@ -152,8 +221,135 @@ def save_session_with_metadata(messages, metadata=None, session_path=None):
         "metadata": metadata
     }
     
-    with open(session_path, 'w') as f:
-        json.dump(session_data, f, indent=2)
+    # Write to a temp file and swap it in, so a crash mid-write never leaves a truncated session
+    fd, tmp_path = tempfile.mkstemp(dir=session_path.parent, prefix=".session-", suffix=".tmp")
+    try:
+        # Encode up front and write once; json.dump to a file issues a write per chunk
+        payload = _encode(session_data, indent=True)
+        target, other = session_path, get_compressed_path(session_path)
+        if len(payload) > COMPRESS_THRESHOLD:
+            # Conversation text compresses several times over; level 1 keeps it cheap
+            payload = gzip.compress(payload, compresslevel=1, mtime=0)
+            target, other = other, target
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    
+    # The new file holds everything; drop the other variant so the two can't drift
+    # apart, and the journal, which would be ignored anyway
+    for stale in (other, get_journal_path(session_path)):
+        try:
+            os.unlink(stale)
+        except OSError:
+            pass
+    
+    return metadata["snapshot"]
+
+
+def append_session_messages(messages, snapshot, session_path=None):
+    """Append messages to the session journal instead of rewriting the whole file.
+    
+    Args:
+        messages: New message objects, in order
+        snapshot: Snapshot id returned by the save these messages follow
+        session_path: Optional session file path (for testing)
+    """
+    if session_path is None:
+        session_path = get_session_file_path()
+    
+    lines = b"".join(
+        _encode({"snapshot": snapshot, "message": serialized}) + b"\n"
+        for msg in messages
+        if (serialized := serialize_message(msg)) is not None
+    )
+    if lines:
+        with open(get_journal_path(session_path), 'ab') as f:
+            f.write(lines)
+
+
+def _read_journal(session_path, snapshot):
+    """Serialized messages journaled on top of the given snapshot."""
+    messages = []
+    try:
+        with open(get_journal_path(session_path), 'rb') as f:
+            for line in f:
+                try:
+                    entry = _decode(line)
+                except ValueError:
+                    continue  # Partial last line from an interrupted append
+                if isinstance(entry, dict) and entry.get("snapshot") == snapshot:
+                    messages.append(entry.get("message"))
+    except FileNotFoundError:
+        pass
+    return messages
+
+
+class SessionWriter:
+    """Coalesces session saves so history is written at most once per delay.
+
+    mark_dirty() schedules a save on a background timer, replacing any
+    pending one; flush_now() writes immediately and must be called on exit.
+    When the history only grew since the last save, the timer appends the new
+    messages to the journal; flush_now() and any other change rewrite the file.
+    """
+
+    def __init__(self, delay=2.0, session_path=None):
+        self.delay = delay
+        self.session_path = session_path
+        self._lock = threading.Lock()
+        self._pending = None
+        self._timer = None
+        self._saved = None
+        self._snapshot = None
+        self._appended = 0
+
+    def mark_dirty(self, messages):
+        """Remember the latest messages and (re)schedule a save."""
+        with self._lock:
+            # Snapshot so later appends on the main thread don't race the writer
+            self._pending = list(messages)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self._flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush_now(self, messages=None):
+        """Cancel any scheduled save and write right away.
+
+        If messages is given it replaces whatever was pending.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if messages is not None:
+                self._pending = list(messages)
+        self._flush(compact=True)
+
+    def _flush(self, compact=False):
+        with self._lock:
+            messages, self._pending = self._pending, None
+            if messages is None:
+                return
+            saved = self._saved
+            if (not compact and saved is not None
+                    and self._appended < JOURNAL_COMPACT_EVERY
+                    and len(messages) >= len(saved)
+                    and all(old is new for old, new in zip(saved, messages))):
+                new_messages = messages[len(saved):]
+                append_session_messages(new_messages, self._snapshot, session_path=self.session_path)
+                self._appended += len(new_messages)
+            else:
+                self._snapshot = save_session_with_metadata(messages, session_path=self.session_path)
+                self._appended = 0
+            self._saved = messages
 
 
 def load_session_with_metadata(session_path=None):
@@ -168,16 +364,29 @@ def load_session_with_metadata(session_path=None):
     if session_path is None:
         session_path = get_session_file_path()
     
-    # Always convert to Path object
-    session_path = Path(session_path)
+    # get_session_file_path() already returns a Path; only callers' strings need wrapping
+    if not isinstance(session_path, Path):
+        session_path = Path(session_path)
+    
+    # Large sessions live in the .gz variant; if a save was interrupted before
+    # removing the other one, the newer file wins
+    candidates = []
+    for path in (session_path, get_compressed_path(session_path)):
+        try:
+            candidates.append((path.stat().st_mtime_ns, path))
+        except OSError:
+            pass
     
     # Return empty if file doesn't exist
-    if not session_path.exists():
+    if not candidates:
         return [], {}
     
     try:
-        with open(session_path, 'r') as f:
-            data = json.load(f)
+        path = max(candidates)[1]
+        raw = path.read_bytes()
+        if path.suffix == ".gz":
+            raw = gzip.decompress(raw)
+        data = _decode(raw)
             
         # Handle backward compatibility with old format
         if isinstance(data, list):
@@ -188,13 +397,15 @@ def load_session_with_metadata(session_path=None):
             # New format: dict with messages and metadata
             messages = data.get("messages", [])
             metadata = data.get("metadata", {})
+            # Replay messages appended after this snapshot was written
+            if metadata.get("snapshot") is not None:
+                messages = messages + _read_journal(session_path, metadata["snapshot"])
         
         # Deserialize messages after loading, filter out None values
-        deserialized = [deserialize_message(msg) for msg in messages]
-        filtered_messages = [msg for msg in deserialized if msg is not None]
+        filtered_messages = [content for msg in messages if (content := deserialize_message(msg)) is not None]
         
         return filtered_messages, metadata
-    except (json.JSONDecodeError, IOError):
+    except (json.JSONDecodeError, IOError, EOFError, zlib.error):
         # If file is corrupted, return empty
         return [], {}
 
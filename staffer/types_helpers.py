@@ -0,0 +1,28 @@
+"""Small builders for the google.genai types Staffer creates over and over."""
+
+from google.genai import types
+
+
+def text_content(role, text):
+    """A single-part text message with the given role."""
+    return types.Content(role=role, parts=[types.Part(text=text)])
+
+
+def user_text(text):
+    """A user text message."""
+    return text_content("user", text)
+
+
+def model_text(text):
+    """A model text message."""
+    return text_content("model", text)
+
+
+def function_response_part(name, response):
+    """A part carrying one function's response dict."""
+    return types.Part(function_response=types.FunctionResponse(name=name, response=response))
+
+
+def tool_response(name, response):
+    """A tool message with a single function response."""
+    return types.Content(role="tool", parts=[function_response_part(name, response)])
@@ -1,20 +1,21 @@
 """Enhanced terminal UI for Staffer interactive mode."""
 
+import importlib.util
 import os
+import re
 from pathlib import Path
 from typing import Dict, Any, Optional
 from contextlib import nullcontext
 
-try:
-    from prompt_toolkit import prompt
-    from prompt_toolkit.history import FileHistory
-    from prompt_toolkit.shortcuts import confirm
-    from rich.console import Console
-    from rich.syntax import Syntax
-    from yaspin import yaspin
-    ENHANCED_MODE_AVAILABLE = True
-except ImportError:
-    ENHANCED_MODE_AVAILABLE = False
+# Only check that the enhanced dependencies are installed; they are imported
+# where first used, since rich and prompt_toolkit are slow to import
+ENHANCED_MODE_AVAILABLE = all(
+    importlib.util.find_spec(name) is not None
+    for name in ("prompt_toolkit", "rich", "yaspin")
+)
+
+# Opening or closing ``` fence; group 1 is the language tag, if any
+_FENCE_RE = re.compile(r"\s*```(.*?)\s*$")
 
 
 class TerminalUI:
@@ -24,6 +25,9 @@ class TerminalUI:
         if not ENHANCED_MODE_AVAILABLE:
             raise ImportError("Enhanced terminal features not available. Install: pip install prompt-toolkit rich yaspin")
         
+        from prompt_toolkit.history import FileHistory
+        from rich.console import Console
+        
         self.console = Console()
         
         # Create history directory if it doesn't exist
@@ -33,6 +37,8 @@ class TerminalUI:
         
     def get_input(self, session_info: Dict[str, Any]) -> str:
         """Get user input with rich prompt and history."""
+        from prompt_toolkit import prompt
+        
         prompt_text = self._build_prompt(session_info)
         return prompt(
             prompt_text,
@@ -70,10 +76,14 @@ class TerminalUI:
     
     def show_spinner(self, message: str):
         """Show processing spinner."""
+        from yaspin import yaspin
+        
         return yaspin(text=message, color="cyan")
     
     def display_code(self, code: str, language: str = "python"):
         """Display syntax-highlighted code."""
+        from rich.syntax import Syntax
+        
         syntax = Syntax(code, language, theme="monokai", line_numbers=True)
         self.console.print(syntax)
     
@@ -99,10 +109,13 @@ class TerminalUI:
         lines = response.split('\n')
         in_code_block = False
         code_lines = []
+        # Consecutive text lines are printed together; each console.print is a full render
+        text_lines = []
         language = "text"
         
         for line in lines:
-            if line.strip().startswith('```'):
+            fence = _FENCE_RE.match(line)
+            if fence:
                 if in_code_block:
                     # End of code block
                     if code_lines:
@@ -112,22 +125,28 @@ class TerminalUI:
                     in_code_block = False
                 else:
                     # Start of code block
-                    language = line.strip()[3:] or "text"
+                    self._flush_text(text_lines)
+                    language = fence.group(1) or "text"
                     in_code_block = True
             elif in_code_block:
                 code_lines.append(line)
             else:
                 # Regular text
-                if line.strip():
-                    self.console.print(line)
-                else:
-                    self.console.print()
+                text_lines.append(line)
+        
+        self._flush_text(text_lines)
         
         # Handle unterminated code block
         if in_code_block and code_lines:
             code = '\n'.join(code_lines)
             self.display_code(code, language)
     
+    def _flush_text(self, text_lines):
+        """Print buffered response text in one call and empty the buffer."""
+        if text_lines:
+            self.console.print('\n'.join(text_lines))
+            text_lines.clear()
+    
     def display_welcome(self):
         """Display welcome message."""
         self.console.print("🚀 Staffer - AI in Folders", style="bold blue")
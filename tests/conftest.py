@@ -112,6 +112,12 @@ def pushd(path):
         os.chdir(old_cwd)
 
 
+@pytest.fixture(autouse=True)
+def isolated_home(tmp_path, monkeypatch):
+    """Keep sessions, history and caches written during tests out of the real home directory."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+
 @pytest.fixture
 def fake_llm(monkeypatch):
     """Patch llm.get_client() so every call returns a FakeGeminiClient."""
@@ -0,0 +1,56 @@
+"""Tests for call_function dispatch and tool result handling."""
+
+from unittest.mock import MagicMock, patch
+
+from staffer import available_functions
+from staffer.available_functions import MAX_RESULT_CHARS, call_function
+
+
+def make_call(name, args=None):
+    """Create a function call part like the ones Gemini returns."""
+    function_call = MagicMock()
+    function_call.name = name
+    function_call.args = args or {}
+    return function_call
+
+
+def test_unknown_function_returns_error():
+    """Unknown function names should produce an error response, not raise."""
+    result = call_function(make_call("not_a_tool"), "/tmp")
+
+    assert result.role == "tool"
+    response = result.parts[0].function_response.response
+    assert response == {"error": "Unknown function: not_a_tool"}
+
+
+def test_unknown_function_responses_are_not_shared():
+    """Each error response is its own object, so editing one can't change another."""
+    first = call_function(make_call("not_a_tool"), "/tmp")
+    second = call_function(make_call("not_a_tool"), "/tmp")
+
+    assert first is not second
+    assert first.parts[0].function_response.response is not second.parts[0].function_response.response
+
+
+def test_large_result_is_truncated():
+    """Oversized tool output should be cut before it is sent back to the model."""
+    huge_output = "x" * (MAX_RESULT_CHARS + 100)
+    fake_run = MagicMock(return_value=huge_output)
+
+    with patch.dict(available_functions._BUILTIN_FUNCTIONS, {"run_python_file": fake_run}):
+        result = call_function(make_call("run_python_file", {"file_path": "big.py"}), "/tmp")
+
+    text = result.parts[0].function_response.response["result"]
+    assert text.startswith("x" * 100)
+    assert f"truncated at {MAX_RESULT_CHARS} characters" in text
+    assert len(text) < len(huge_output)
+
+
+def test_small_result_is_unchanged():
+    """Normal-sized tool output passes through untouched."""
+    fake_run = MagicMock(return_value="STDOUT: hello\nSTDERR: ")
+
+    with patch.dict(available_functions._BUILTIN_FUNCTIONS, {"run_python_file": fake_run}):
+        result = call_function(make_call("run_python_file", {"file_path": "hi.py"}), "/tmp")
+
+    assert result.parts[0].function_response.response == {"result": "STDOUT: hello\nSTDERR: "}
@@ -0,0 +1,140 @@
+"""Tests for trimming the history sent to the model."""
+
+from google.genai import types
+
+from staffer.context import (
+    dedup_tool_results,
+    request_view,
+    supersede_file_results,
+    trim_messages,
+)
+from tests.factories import model, tool_resp, user
+
+
+def test_short_history_is_returned_unchanged():
+    """Nothing is older than the window, so the same list comes back."""
+    messages = [user("hi"), tool_resp("get_file_content", "x" * 10000)]
+
+    assert trim_messages(messages, keep_last_n=8) is messages
+
+
+def test_old_large_tool_results_are_shortened():
+    """Big tool output outside the window keeps only its head and tail."""
+    big = "a" * 300 + "b" * 5000 + "c" * 300
+    old_tool = tool_resp("get_file_content", big)
+    messages = [user("read it"), old_tool, model("done"), user("next")]
+
+    trimmed = trim_messages(messages, max_tool_chars=4000, keep_last_n=2)
+
+    result = trimmed[1].parts[0].function_response.response["result"]
+    assert result == "a" * 200 + "...[truncated]..." + "c" * 200
+    assert trimmed[1].parts[0].function_response.name == "get_file_content"
+    # The caller's history is left intact
+    assert old_tool.parts[0].function_response.response["result"] == big
+
+
+def test_recent_and_small_messages_are_kept():
+    """Recent tool output, small tool output and user/model text are untouched."""
+    small_tool = tool_resp("get_files_info", "- a.py")
+    recent_tool = tool_resp("get_file_content", "x" * 10000)
+    messages = [user("u" * 10000), small_tool, model("m"), recent_tool]
+
+    trimmed = trim_messages(messages, max_tool_chars=4000, keep_last_n=1)
+
+    assert trimmed[0] is messages[0]
+    assert trimmed[1] is small_tool
+    assert trimmed[3] is recent_tool
+
+
+def test_repeated_tool_results_point_at_latest_copy():
+    """Only the most recent copy of an identical result is sent in full."""
+    content = "print('hello')\n" * 50
+    first = tool_resp("get_file_content", content)
+    latest = tool_resp("get_file_content", content)
+    other = tool_resp("get_files_info", content)
+    messages = [user("read it"), first, model("ok"), user("again"), latest, other]
+
+    deduped = dedup_tool_results(messages)
+
+    assert deduped[1].parts[0].function_response.response == {
+        "result": "[identical to a later get_file_content result]"
+    }
+    assert deduped[4] is latest
+    # Same text from a different function is not treated as a repeat
+    assert deduped[5] is other
+    # The caller's history is left intact
+    assert first.parts[0].function_response.response["result"] == content
+
+
+def test_repeats_of_a_copy_that_will_be_trimmed_are_kept():
+    """A later copy outside the keep window gets truncated, so nothing points at it."""
+    content = "x" * 5000
+    first = tool_resp("get_file_content", content)
+    later = tool_resp("get_file_content", content)
+    messages = [first, later, model("ok"), user("next")]
+
+    deduped = dedup_tool_results(messages, max_tool_chars=4000, keep_last_n=2)
+
+    assert deduped == messages
+    view = request_view([*messages, *(model("...") for _ in range(8))])
+    assert "[truncated]" in view[0].parts[0].function_response.response["result"]
+    assert "[truncated]" in view[1].parts[0].function_response.response["result"]
+
+
+def test_short_repeated_results_are_kept():
+    """Small results cost less than the reference note, so they stay as they are."""
+    first = tool_resp("get_files_info", "- a.py")
+    messages = [first, tool_resp("get_files_info", "- a.py")]
+
+    assert dedup_tool_results(messages)[0] is first
+
+
+def _call(name, **args):
+    return types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(name=name, args=args))])
+
+
+def test_earlier_reads_of_the_same_file_are_superseded():
+    """Only the latest read of a file is sent; other files and functions are untouched."""
+    old_read = tool_resp("get_file_content", "old contents")
+    other_file = tool_resp("get_file_content", "other contents")
+    write = tool_resp("write_file", 'Successfully wrote to "main.py"')
+    new_read = tool_resp("get_file_content", "new contents")
+    messages = [
+        user("fix main.py"),
+        _call("get_file_content", file_path="main.py"), old_read,
+        _call("get_file_content", file_path="util.py"), other_file,
+        _call("write_file", file_path="main.py", content="..."), write,
+        _call("get_file_content", file_path="./main.py"), new_read,
+    ]
+
+    view = supersede_file_results(messages)
+
+    assert view[2].parts[0].function_response.response == {
+        "result": "[superseded by a later get_file_content of main.py]"
+    }
+    assert view[4] is other_file
+    assert view[6] is write
+    assert view[8] is new_read
+    assert old_read.parts[0].function_response.response == {"result": "old contents"}
+
+
+def test_repeated_script_runs_are_kept():
+    """Run output also depends on imports and arguments, so earlier runs stay visible."""
+    before = tool_resp("run_python_file", "AssertionError")
+    after = tool_resp("run_python_file", "OK")
+    messages = [
+        _call("run_python_file", file_path="tests.py"), before,
+        _call("run_python_file", file_path="tests.py"), after,
+    ]
+
+    view = supersede_file_results(messages)
+
+    assert view[1] is before
+    assert view[3] is after
+
+
+def test_request_view_leaves_plain_history_alone():
+    """Histories without tool output pass through unchanged."""
+    messages = [user("hi"), model("hello")]
+
+    assert request_view(messages) == messages
@@ -163,4 +163,126 @@ def test_preserves_valid_tool_responses():
     preserved_tool = tool_responses[0]
     result = str(preserved_tool.parts[0].function_response.response.get("result", ""))
     assert str(current_dir) in result
-    assert str(current_dir.parent) not in result or str(current_dir) in result
\ No newline at end of file
+    assert str(current_dir.parent) not in result or str(current_dir) in result
+
+
+def test_prune_decisions_are_reused_per_cwd():
+    """Messages already checked for a cwd aren't rescanned on the next turn."""
+    from unittest.mock import patch
+
+    from staffer import main
+
+    old = types.Content(role="model", parts=[types.Part(text="Working in /home/user")])
+    kept = types.Content(role="model", parts=[types.Part(text="hello")])
+    messages = [old, kept]
+    current = Path("/home/user/project")
+
+    assert main.prune_stale_dir_msgs(messages, current) == [kept]
+
+    new = types.Content(role="model", parts=[types.Part(text="Files in /home/user")])
+    with patch("staffer.main._is_stale", wraps=main._is_stale) as is_stale:
+        assert main.prune_stale_dir_msgs(messages + [new], current) == [kept]
+        # Only the new message was inspected
+        assert [call.args[0] for call in is_stale.call_args_list] == [new]
+
+    # A different cwd gets its own decisions
+    assert main.prune_stale_dir_msgs(messages, Path("/home")) == messages
+
+
+def test_token_budget_keeps_recent_messages_and_opening_request():
+    """Large history is cut to the budget from the oldest side, keeping the first user message."""
+    current = Path("/test/dir")
+    opening = types.Content(role="user", parts=[types.Part(text="refactor the parser")])
+    big_results = [
+        types.Content(role="model", parts=[types.Part(text=f"{i}" + "x" * 4000)])
+        for i in range(5)
+    ]
+    latest = types.Content(role="user", parts=[types.Part(text="now add tests")])
+
+    pruned = prune_stale_dir_msgs([opening] + big_results + [latest], current, token_budget=2500)
+
+    # Two 1000-token results plus the latest prompt fit; older ones are dropped
+    assert pruned == [opening, big_results[3], big_results[4], latest]
+
+
+def test_token_budget_never_keeps_a_response_without_its_call():
+    """A cut between a function call and its response drops the response too."""
+    current = Path("/test/dir")
+    opening = types.Content(role="user", parts=[types.Part(text="write the file")])
+    call = types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(
+        name="write_file", args={"file_path": "big.txt", "content": "x" * 4000},
+    ))])
+    response = types.Content(role="tool", parts=[types.Part(function_response=types.FunctionResponse(
+        name="write_file", response={"result": "ok"},
+    ))])
+    answer = types.Content(role="model", parts=[types.Part(text="Done.")])
+    latest = types.Content(role="user", parts=[types.Part(text="thanks")])
+
+    pruned = prune_stale_dir_msgs([opening, call, response, answer, latest], current, token_budget=300)
+
+    assert pruned == [opening, answer, latest]
+
+
+def test_newest_message_over_budget_is_dropped():
+    """A single message larger than the whole budget can't be sent, so it goes too."""
+    opening = types.Content(role="user", parts=[types.Part(text="hi")])
+    huge = types.Content(role="model", parts=[types.Part(text="x" * 4000)])
+
+    assert prune_stale_dir_msgs([opening, huge], Path("/test/dir"), token_budget=300) == [opening]
+
+
+def test_history_under_token_budget_is_untouched():
+    """Nothing is dropped when the history fits."""
+    messages = [types.Content(role="user", parts=[types.Part(text="hi")]) for _ in range(3)]
+
+    assert prune_stale_dir_msgs(messages, Path("/test/dir")) == messages
+
+
+def test_extended_history_only_checks_new_messages():
+    """Messages checked on an earlier turn aren't checked again, but replaced ones are."""
+    from unittest.mock import patch
+
+    from staffer import main
+
+    current = Path("/home/user/project")
+    kept = types.Content(role="model", parts=[types.Part(text="hello")])
+    history = main.prune_stale_dir_msgs(
+        [types.Content(role="model", parts=[types.Part(text="Working in /home/user")]), kept],
+        current,
+    )
+    assert history == [kept]
+
+    new = types.Content(role="model", parts=[types.Part(text="Files in /home/user")])
+    history.append(new)
+    with patch("staffer.main._is_stale", wraps=main._is_stale) as is_stale:
+        pruned = main.prune_stale_dir_msgs(history, current)
+
+    assert pruned == [kept]
+    assert pruned is not history
+    assert [call.args[0] for call in is_stale.call_args_list] == [new]
+
+    # An earlier entry swapped in place is a new message and gets checked
+    replacement = types.Content(role="model", parts=[types.Part(text="Working in /home/user")])
+    history[0] = replacement
+    with patch("staffer.main._is_stale", wraps=main._is_stale) as is_stale:
+        pruned = main.prune_stale_dir_msgs(history, current)
+
+    assert pruned == []
+    assert [call.args[0] for call in is_stale.call_args_list] == [replacement]
+
+
+def test_stale_decisions_are_dropped_with_their_message():
+    """Remembered decisions go away as soon as the message is collected."""
+    import gc
+
+    from staffer import main
+
+    message = types.Content(role="model", parts=[types.Part(text="hello")])
+    main.prune_stale_dir_msgs([message], Path("/home/user/project"))
+    key = (id(message), "/home/user/project")
+    assert key in main._stale_cache
+
+    del message
+    gc.collect()
+
+    assert key not in main._stale_cache
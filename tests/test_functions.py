@@ -0,0 +1,160 @@
+"""Tests for the built-in file functions the AI can call."""
+
+from staffer.functions.get_file_content import MAX_CHARS, get_file_content
+from staffer.functions.get_files_info import get_files_info
+from staffer.functions.run_python_file import run_python_file
+from staffer.functions.write_file import write_file
+
+
+def test_get_file_content_reads_small_file(tmp_path):
+    """Files under the cap come back unchanged."""
+    (tmp_path / "hello.txt").write_text("hello world")
+
+    assert get_file_content(str(tmp_path), "hello.txt") == "hello world"
+
+
+def test_get_file_content_exact_limit_is_not_truncated(tmp_path):
+    """A file of exactly MAX_CHARS characters is complete, not truncated."""
+    (tmp_path / "exact.txt").write_text("x" * MAX_CHARS)
+
+    result = get_file_content(str(tmp_path), "exact.txt")
+
+    assert result == "x" * MAX_CHARS
+
+
+def test_get_file_content_truncates_long_file(tmp_path):
+    """Longer files are cut at MAX_CHARS characters with a notice."""
+    (tmp_path / "long.txt").write_text("é" * (MAX_CHARS + 1))
+
+    result = get_file_content(str(tmp_path), "long.txt")
+
+    assert result.startswith("é" * MAX_CHARS + "...")
+    assert f"truncated at {MAX_CHARS} characters" in result
+
+
+def test_get_file_content_handles_non_utf8_bytes(tmp_path):
+    """Undecodable bytes are replaced instead of failing the whole read."""
+    (tmp_path / "data.bin").write_bytes(b"\xff\xfehello")
+
+    result = get_file_content(str(tmp_path), "data.bin")
+
+    assert result.endswith("hello")
+    assert not result.startswith("Error")
+
+
+def test_get_file_content_rejects_paths_outside_working_directory(tmp_path):
+    """The sandbox check still applies."""
+    result = get_file_content(str(tmp_path), "../outside.txt")
+
+    assert result.startswith("Error: Cannot read")
+
+
+def test_sibling_directory_with_shared_prefix_is_rejected(tmp_path):
+    """/tmp/foo must not grant access to /tmp/foobar."""
+    work_dir = tmp_path / "foo"
+    work_dir.mkdir()
+    sibling = tmp_path / "foobar"
+    sibling.mkdir()
+    (sibling / "secret.txt").write_text("secret")
+
+    result = get_file_content(str(work_dir), "../foobar/secret.txt")
+
+    assert result.startswith("Error: Cannot read")
+
+
+def test_files_info_rejects_sibling_directory_with_shared_prefix(tmp_path):
+    """get_files_info uses the same sandbox check."""
+    (tmp_path / "foo").mkdir()
+    (tmp_path / "foobar").mkdir()
+
+    result = get_files_info(str(tmp_path / "foo"), "../foobar")
+
+    assert result.startswith("Error: Cannot list")
+
+
+def test_relative_working_directory_follows_chdir(tmp_path, monkeypatch):
+    """A relative working directory is resolved against the current cwd each call."""
+    for name in ("a", "b"):
+        (tmp_path / name / "calculator").mkdir(parents=True)
+        (tmp_path / name / "calculator" / "main.py").write_text(name)
+
+    monkeypatch.chdir(tmp_path / "a")
+    assert get_file_content("calculator", "main.py") == "a"
+    monkeypatch.chdir(tmp_path / "b")
+    assert get_file_content("calculator", "main.py") == "b"
+
+
+def test_files_info_lists_working_directory_by_default(tmp_path):
+    """No directory argument means the working directory itself."""
+    (tmp_path / "a.txt").write_text("a")
+
+    result = get_files_info(str(tmp_path))
+
+    assert "- a.txt: file_size=1 bytes, is_dir=False" in result
+
+
+def test_write_file_creates_missing_directories(tmp_path):
+    """Parent directories are created as needed."""
+    result = write_file(str(tmp_path), "nested/dir/out.txt", "héllo")
+
+    assert result == 'Successfully wrote to "nested/dir/out.txt" (5 characters written)'
+    assert (tmp_path / "nested" / "dir" / "out.txt").read_text(encoding="utf-8") == "héllo"
+
+
+def test_write_file_overwrites_existing_file(tmp_path):
+    """Existing content is replaced, not appended to."""
+    (tmp_path / "out.txt").write_text("a much longer original content")
+
+    write_file(str(tmp_path), "out.txt", "short")
+
+    assert (tmp_path / "out.txt").read_text() == "short"
+
+
+def test_write_file_writes_large_content(tmp_path):
+    """Content larger than a single write buffer is written in full."""
+    content = "x" * (4 * 1024 * 1024)
+
+    write_file(str(tmp_path), "big.txt", content)
+
+    assert (tmp_path / "big.txt").read_text() == content
+
+
+def test_write_file_respects_umask(tmp_path):
+    """New files get the same umask-based permissions as open(..., "w")."""
+    import os
+
+    old_umask = os.umask(0o022)
+    try:
+        write_file(str(tmp_path), "out.txt", "data")
+    finally:
+        os.umask(old_umask)
+
+    assert (tmp_path / "out.txt").stat().st_mode & 0o777 == 0o644
+
+    old_umask = os.umask(0o002)
+    try:
+        write_file(str(tmp_path), "shared.txt", "data")
+    finally:
+        os.umask(old_umask)
+
+    assert (tmp_path / "shared.txt").stat().st_mode & 0o777 == 0o664
+
+
+def test_run_python_file_returns_output(tmp_path):
+    """Successful runs report stdout and stderr."""
+    (tmp_path / "ok.py").write_text("print('hi')")
+
+    result = run_python_file(str(tmp_path), "ok.py")
+
+    assert result == "STDOUT: hi\n\nSTDERR: "
+
+
+def test_run_python_file_keeps_output_on_failure(tmp_path):
+    """A non-zero exit still returns stdout and stderr so the error can be diagnosed."""
+    (tmp_path / "fail.py").write_text("print('before')\nraise SystemExit('boom')")
+
+    result = run_python_file(str(tmp_path), "fail.py")
+
+    assert result.startswith("Process exited with code 1\n")
+    assert "STDOUT: before" in result
+    assert "boom" in result
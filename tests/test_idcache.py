@@ -0,0 +1,43 @@
+"""Tests for the per-object memoization helper."""
+
+import gc
+
+from staffer._idcache import get_or_compute
+
+
+class Message:
+    pass
+
+
+def test_value_is_computed_once_per_object_and_key():
+    cache = {}
+    calls = []
+    message = Message()
+
+    def compute(obj):
+        calls.append(obj)
+        return len(calls)
+
+    assert get_or_compute(cache, message, compute) == 1
+    assert get_or_compute(cache, message, compute) == 1
+    assert get_or_compute(cache, message, compute, key=(id(message), "/other")) == 2
+    assert calls == [message, message]
+
+
+def test_entries_are_dropped_when_the_object_is_collected():
+    cache = {}
+    message = Message()
+    get_or_compute(cache, message, lambda obj: 1)
+    assert cache
+
+    del message
+    gc.collect()
+
+    assert cache == {}
+
+
+def test_objects_without_weakrefs_are_not_cached():
+    cache = {}
+
+    assert get_or_compute(cache, "text", len) == 4
+    assert cache == {}
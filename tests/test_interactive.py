@@ -82,45 +82,70 @@ def test_interactive_flag_detection():
 
 def test_message_history_persistence():
     """Interactive mode should maintain message history between prompts."""
-    # Use factory-based approach with fake_llm
-    from tests.conftest import FakeGeminiClient
-    
-    with patch('staffer.cli.interactive.get_client') as mock_get_client:
-        fake_client = FakeGeminiClient()
-        mock_get_client.return_value = fake_client
-        
-        # Mock session loading to return empty (fresh session)
-        with patch('staffer.cli.interactive.load_session', return_value=[]):
-            with patch('staffer.cli.interactive.save_session'):
-                # Mock process_prompt to capture calls and return growing history  
-                with patch('staffer.cli.interactive.process_prompt') as mock_process:
-                    # Setup side effects: return growing message history
-                    mock_process.side_effect = [
-                        ['msg1'],  # First call returns 1 message
-                        ['msg1', 'msg2']  # Second call returns 2 messages
-                    ]
-                    
-                    # Mock terminal UI to control input
-                    with patch('staffer.cli.interactive.get_terminal_ui') as mock_get_terminal:
-                        mock_terminal = MagicMock()
-                        mock_terminal.get_input.side_effect = ['hello', 'what is my name?', 'exit']
-                        mock_terminal.show_spinner.return_value = MagicMock(__enter__=MagicMock(), __exit__=MagicMock())
-                        mock_get_terminal.return_value = mock_terminal
-                        
-                        from staffer.cli import interactive
-                        interactive.main()
-
-                    # Verify process_prompt was called twice
-                    assert mock_process.call_count == 2
-
-                    # Check the arguments passed to each call
-                    first_call = mock_process.call_args_list[0]
-                    second_call = mock_process.call_args_list[1]
-
-                    # First call should have minimal messages (just working dir init)
-                    first_messages = first_call.kwargs['messages']
+    # Mock session loading to return empty (fresh session)
+    with patch('staffer.cli.interactive.load_session', return_value=[]):
+        with patch('staffer.cli.interactive.save_session'):
+            # Mock process_prompt to capture calls and return growing history  
+            with patch('staffer.cli.interactive.process_prompt') as mock_process:
+                # Setup side effects: return growing message history
+                mock_process.side_effect = [
+                    ['msg1'],  # First call returns 1 message
+                    ['msg1', 'msg2']  # Second call returns 2 messages
+                ]
+                
+                # Mock terminal UI to control input
+                with patch('staffer.cli.interactive.get_terminal_ui') as mock_get_terminal:
+                    mock_terminal = MagicMock()
+                    mock_terminal.get_input.side_effect = ['hello', 'what is my name?', 'exit']
+                    mock_terminal.show_spinner.return_value = MagicMock(__enter__=MagicMock(), __exit__=MagicMock())
+                    mock_get_terminal.return_value = mock_terminal
                     
-                    # Second call should have the history from first call
-                    second_messages = second_call.kwargs['messages']
-                    assert len(second_messages) == 1, "Second call should receive history from first call"
-                    assert second_messages == ['msg1']
\ No newline at end of file
+                    from staffer.cli import interactive
+                    interactive.main()
+
+                # Verify process_prompt was called twice
+                assert mock_process.call_count == 2
+
+                # Check the arguments passed to each call
+                first_call = mock_process.call_args_list[0]
+                second_call = mock_process.call_args_list[1]
+
+                # First call should have minimal messages (just working dir init)
+                first_messages = first_call.kwargs['messages']
+                
+                # Second call should have the history from first call
+                second_messages = second_call.kwargs['messages']
+                assert len(second_messages) == 1, "Second call should receive history from first call"
+                assert second_messages == ['msg1']
+
+def test_version_does_not_import_genai():
+    """--version is answered by the parser before the SDK is imported."""
+    code = (
+        "import sys\n"
+        "sys.argv = ['staffer', '--version']\n"
+        "from staffer.cli import main\n"
+        "try:\n"
+        "    main()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print('google.genai' in sys.modules)\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=False)
+
+    assert "Staffer 0.2.0" in result.stdout
+    assert result.stdout.strip().endswith("False")
+
+
+def test_each_run_gets_its_own_session_writer():
+    """Debounce state doesn't leak from one interactive session into the next."""
+    with patch('staffer.cli.interactive.load_session_with_metadata', return_value=([], {})), \
+         patch('staffer.cli.interactive.initialize_session_with_working_directory', return_value=[]), \
+         patch('staffer.cli.interactive.SessionWriter') as writer_class:
+        from staffer.cli import interactive
+
+        for _ in range(2):
+            with patch('builtins.input', side_effect=['exit']):
+                interactive.main()
+
+    assert writer_class.call_count == 2
+    writer_class.return_value.flush_now.assert_called_with([])
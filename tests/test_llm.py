@@ -0,0 +1,138 @@
+"""Tests for the LLM client helpers."""
+
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+from google.genai import types
+
+from staffer.llm import generate_with_timeout, stream_generate
+
+
+def chunk(*parts, usage=None):
+    """Create one streamed response chunk."""
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=list(parts)))],
+        usage_metadata=usage,
+    )
+
+
+def test_stream_generate_reports_text_as_it_arrives():
+    """Each text chunk should reach the callback before the stream finishes."""
+    client = MagicMock()
+    client.models.generate_content_stream.return_value = iter([
+        chunk(types.Part(text="Hello ")),
+        chunk(types.Part(text="world"), usage=types.GenerateContentResponseUsageMetadata(prompt_token_count=7)),
+    ])
+    seen = []
+
+    res = stream_generate(client, seen.append, model="m", contents=[], config=None)
+
+    assert seen == ["Hello ", "world"]
+    assert res.text == "Hello world"
+    assert res.usage_metadata.prompt_token_count == 7
+
+
+def test_stream_generate_keeps_function_calls():
+    """Function calls in the stream must survive so the tool loop can run them."""
+    client = MagicMock()
+    client.models.generate_content_stream.return_value = iter([
+        chunk(types.Part(text="Let me look.")),
+        chunk(types.Part(function_call=types.FunctionCall(name="get_files_info", args={}))),
+    ])
+
+    res = stream_generate(client, lambda text: None, model="m", contents=[], config=None)
+
+    parts = res.candidates[0].content.parts
+    assert parts[0].text == "Let me look."
+    assert parts[1].function_call.name == "get_files_info"
+
+
+def test_generate_with_timeout_retries_stalled_call():
+    """A request the HTTP client timed out is retried."""
+    client = MagicMock()
+    client.models.generate_content.side_effect = [httpx.ReadTimeout("stalled"), "fresh"]
+
+    res = generate_with_timeout(client, retries=1, backoff=0, model="m")
+
+    assert res == "fresh"
+    assert client.models.generate_content.call_count == 2
+
+
+def test_generate_with_timeout_gives_up_after_retries():
+    """Once retries are exhausted the caller gets a TimeoutError instead of hanging."""
+    client = MagicMock()
+    client.models.generate_content.side_effect = httpx.ReadTimeout("stalled")
+
+    with pytest.raises(TimeoutError):
+        generate_with_timeout(client, retries=1, backoff=0, model="m")
+
+    assert client.models.generate_content.call_count == 2
+
+
+def test_stream_generate_retries_before_first_chunk():
+    """A stream that times out before producing anything is retried."""
+    def stalled_stream():
+        raise httpx.ReadTimeout("stalled")
+        yield  # pragma: no cover
+
+    client = MagicMock()
+    client.models.generate_content_stream.side_effect = [
+        stalled_stream(),
+        iter([chunk(types.Part(text="done"))]),
+    ]
+
+    res = stream_generate(client, lambda text: None, backoff=0, model="m", contents=[], config=None)
+
+    assert res.text == "done"
+
+
+def test_stream_generate_does_not_repeat_streamed_text():
+    """A timeout after text was shown is raised rather than retried."""
+    def broken_stream():
+        yield chunk(types.Part(text="partial"))
+        raise httpx.ReadTimeout("stalled")
+
+    client = MagicMock()
+    client.models.generate_content_stream.return_value = broken_stream()
+    seen = []
+
+    with pytest.raises(TimeoutError):
+        stream_generate(client, seen.append, backoff=0, model="m", contents=[], config=None)
+
+    assert seen == ["partial"]
+    assert client.models.generate_content_stream.call_count == 1
+
+
+def test_default_client_sets_http_timeout(monkeypatch):
+    """The real client gets STAFFER_LLM_TIMEOUT as its HTTP timeout, in milliseconds."""
+    from staffer import llm
+
+    created = []
+    monkeypatch.setenv("STAFFER_LLM_TIMEOUT", "5")
+    monkeypatch.setattr(llm.genai, "Client", lambda **kwargs: created.append(kwargs) or object())
+    llm.reset_client()
+
+    llm._default_client_factory()
+    llm.reset_client()
+
+    assert created[0]["http_options"].timeout == 5000
+
+
+def test_default_client_is_reused(monkeypatch):
+    """The real client is built once and shared until reset_client()."""
+    from staffer import llm
+
+    created = []
+    monkeypatch.setattr(llm.genai, "Client", lambda **kwargs: created.append(kwargs) or object())
+    monkeypatch.setattr(llm, "_client_factory", llm._default_client_factory)
+    llm.reset_client()
+
+    first = llm.get_client()
+    assert llm.get_client() is first
+    assert len(created) == 1
+
+    llm.reset_client()
+    assert llm.get_client() is not first
+    assert len(created) == 2
+    llm.reset_client()
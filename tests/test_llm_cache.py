@@ -0,0 +1,126 @@
+"""Tests for the generate_content response cache."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from google.genai import types
+
+from staffer import llm_cache
+from tests.factories import user
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    """Point the cache at a temp directory and start from an empty cache."""
+    with patch('staffer.llm_cache.get_cache_dir', return_value=tmp_path / "cache"):
+        llm_cache.clear_cache()
+        yield tmp_path / "cache"
+        llm_cache.clear_cache()
+    llm_cache.set_cache_enabled(True)
+
+
+def make_response(text):
+    """Create a real SDK response with a single text candidate."""
+    return types.GenerateContentResponse(candidates=[
+        types.Candidate(content=types.Content(role="model", parts=[types.Part(text=text)]))
+    ])
+
+
+def make_client(*responses):
+    client = MagicMock()
+    client.models.generate_content.side_effect = list(responses)
+    return client
+
+
+def test_identical_request_is_served_from_cache(cache_dir):
+    """Second identical request should not hit the model."""
+    client = make_client(make_response("first"), make_response("second"))
+    config = types.GenerateContentConfig(system_instruction="be helpful")
+
+    first = llm_cache.cached_generate(client, model="m", contents=[user("hi")], config=config)
+    second = llm_cache.cached_generate(client, model="m", contents=[user("hi")], config=config)
+
+    assert client.models.generate_content.call_count == 1
+    assert second.text == first.text == "first"
+
+
+def test_different_contents_miss_cache(cache_dir):
+    """Changing the conversation must produce a fresh model call."""
+    client = make_client(make_response("first"), make_response("second"))
+
+    llm_cache.cached_generate(client, model="m", contents=[user("hi")], config=None)
+    result = llm_cache.cached_generate(client, model="m", contents=[user("bye")], config=None)
+
+    assert client.models.generate_content.call_count == 2
+    assert result.text == "second"
+
+
+def test_responses_persist_on_disk(cache_dir):
+    """A new process (empty memory cache) should reuse responses saved on disk."""
+    client = make_client(make_response("from disk"))
+    llm_cache.cached_generate(client, model="m", contents=[user("hi")], config=None)
+    assert len(list(cache_dir.glob("*.json"))) == 1
+
+    llm_cache._memory_cache.clear()
+    fresh_client = make_client()
+    result = llm_cache.cached_generate(fresh_client, model="m", contents=[user("hi")], config=None)
+
+    fresh_client.models.generate_content.assert_not_called()
+    assert result.text == "from disk"
+
+
+def test_disabled_cache_always_calls_model(cache_dir):
+    """--no-cache should bypass lookups entirely."""
+    llm_cache.set_cache_enabled(False)
+    client = make_client(make_response("first"), make_response("second"))
+
+    llm_cache.cached_generate(client, model="m", contents=[user("hi")], config=None)
+    result = llm_cache.cached_generate(client, model="m", contents=[user("hi")], config=None)
+
+    assert client.models.generate_content.call_count == 2
+    assert result.text == "second"
+
+
+def test_clear_cache_forgets_responses(cache_dir):
+    """/reset clears the cache so the next identical request goes to the model."""
+    client = make_client(make_response("first"), make_response("second"))
+
+    llm_cache.cached_generate(client, model="m", contents=[user("hi")], config=None)
+    llm_cache.clear_cache()
+    assert not list(cache_dir.glob("*.json"))
+
+    result = llm_cache.cached_generate(client, model="m", contents=[user("hi")], config=None)
+
+    assert client.models.generate_content.call_count == 2
+    assert result.text == "second"
+
+
+def make_stream_client(*texts):
+    client = MagicMock()
+    client.models.generate_content_stream.side_effect = [iter([make_response(text)]) for text in texts]
+    return client
+
+
+def test_streamed_response_is_replayed_from_cache(cache_dir):
+    """A repeated streamed request replays the cached text without calling the model."""
+    client = make_stream_client("first", "second")
+    seen = []
+
+    llm_cache.cached_stream_generate(client, seen.append, model="m", contents=[user("hi")], config=None)
+    result = llm_cache.cached_stream_generate(client, seen.append, model="m", contents=[user("hi")], config=None)
+
+    assert client.models.generate_content_stream.call_count == 1
+    assert seen == ["first", "first"]
+    assert result.text == "first"
+
+
+def test_no_cache_applies_to_streamed_requests(cache_dir):
+    """--no-cache also bypasses the cache in single-command (streaming) mode."""
+    llm_cache.set_cache_enabled(False)
+    client = make_stream_client("first", "second")
+
+    llm_cache.cached_stream_generate(client, lambda text: None, model="m", contents=[user("hi")], config=None)
+    result = llm_cache.cached_stream_generate(client, lambda text: None, model="m", contents=[user("hi")], config=None)
+
+    assert client.models.generate_content_stream.call_count == 2
+    assert result.text == "second"
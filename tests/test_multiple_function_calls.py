@@ -226,4 +226,72 @@ def test_function_response_parts_match_function_calls():
                     assert hasattr(part, 'function_response'), \
                         "Each part should be a function response"
                     assert part.function_response is not None, \
-                        "Function response should not be None"
\ No newline at end of file
+                        "Function response should not be None"
+
+def test_read_only_function_calls_run_concurrently():
+    """Independent read-only calls in one turn should not wait on each other."""
+    import threading
+
+    from google.genai.types import FunctionCall
+
+    from staffer.main import run_function_calls
+
+    function_calls = [
+        FunctionCall(name="get_file_content", args={"file_path": f"file{i}.py"})
+        for i in range(3)
+    ]
+    # Each call blocks until all three are in flight; sequential execution would time out
+    barrier = threading.Barrier(len(function_calls), timeout=2)
+
+    def fake_call_function(function_call, working_directory, verbose=False):
+        barrier.wait()
+        return tool_resp(function_call.name, function_call.args["file_path"])
+
+    with patch('staffer.main.call_function', side_effect=fake_call_function):
+        results = run_function_calls(function_calls, Path("/test/directory"))
+
+    # Results come back in the order the model asked for them
+    assert [r.parts[0].function_response.response["result"] for r in results] == \
+        ["file0.py", "file1.py", "file2.py"]
+
+
+def test_write_function_calls_keep_sequential_order():
+    """Turns that write or execute must run calls one after another, in order."""
+    from google.genai.types import FunctionCall
+
+    from staffer.main import run_function_calls
+
+    function_calls = [
+        FunctionCall(name="write_file", args={"file_path": "a.py", "content": "print(1)"}),
+        FunctionCall(name="run_python_file", args={"file_path": "a.py"}),
+    ]
+    order = []
+
+    def fake_call_function(function_call, working_directory, verbose=False):
+        order.append(function_call.name)
+        return tool_resp(function_call.name, "ok")
+
+    with patch('staffer.main.call_function', side_effect=fake_call_function):
+        run_function_calls(function_calls, Path("/test/directory"))
+
+    assert order == ["write_file", "run_python_file"]
+
+
+def test_streamed_prompt_prints_text_as_it_arrives(capsys):
+    """Single-command mode streams the final answer instead of waiting for the whole turn."""
+    with patch('staffer.main.get_client') as mock_get_client:
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.models.generate_content_stream.return_value = iter([
+            types.GenerateContentResponse(candidates=[types.Candidate(
+                content=types.Content(role="model", parts=[types.Part(text=text)])
+            )])
+            for text in ["Here are ", "your files."]
+        ])
+
+        with patch('os.getcwd', return_value="/test/directory"):
+            result_messages = process_prompt("list files", messages=[], stream=True)
+
+    mock_client.models.generate_content.assert_not_called()
+    assert "Here are your files." in capsys.readouterr().out
+    assert result_messages[-1].parts[0].text == "Here are your files."
@@ -101,6 +101,33 @@ That's the code!"""
                 'python'
             )
 
+    def test_code_fence_language_detection(self):
+        """Fences may be indented and tags aren't limited to word characters."""
+        # Skip __init__ so the parsing runs without the enhanced dependencies
+        ui = TerminalUI.__new__(TerminalUI)
+        ui.console = MagicMock()
+
+        with patch.object(ui, 'display_code') as mock_display_code:
+            ui.display_ai_response("  ```c++  \nint x;\n  ```\n```\nplain\n```")
+
+        assert mock_display_code.call_args_list == [
+            (('int x;', 'c++'),),
+            (('plain', 'text'),),
+        ]
+
+    def test_response_text_is_printed_per_region(self):
+        """Text between code blocks goes to the console in one print each."""
+        ui = TerminalUI.__new__(TerminalUI)
+        ui.console = MagicMock()
+
+        with patch.object(ui, 'display_code'):
+            ui.display_ai_response("intro\n\nmore\n```\ncode\n```\noutro")
+
+        assert ui.console.print.call_args_list == [
+            (('intro\n\nmore',),),
+            (('outro',),),
+        ]
+
 
 class TestTerminalUIIntegration:
     """Test terminal UI integration with interactive mode."""